@@ -0,0 +1,7 @@
+"""
+Benchmarks del pipeline SERVQUAL
+================================
+Datos sintéticos con el esquema del almacén (benchmarks.sintetico) y tiempos por
+etapa a distintos tamaños (benchmarks.etapas). Los datasets generados y los
+resultados quedan en benchmarks/datos/ y benchmarks/resultados/ (ignorados por git).
+"""
@@ -0,0 +1,158 @@
+"""
+Tiempos por etapa del pipeline
+==============================
+Mide cada etapa del dashboard sobre almacenes sintéticos de 10³ a 10⁷ filas, con
+el mismo código que corre el dashboard: carga, índice de filtros, acumulados y
+cada derivado de Acumulados para un filtro (KPIs, estados, segmentos, NPS por
+grupo, ítems, resumen, regresión), facetas, serie de volumen, pestaña de
+estadística y figuras de servqual.figuras (incluida su serialización), más los
+acumulados en DuckDB si está instalado.
+
+Cada etapa se repite y se guarda la mediana y el mínimo junto con las versiones
+de las librerías, así que dos corridas con la misma semilla son comparables:
+
+    python -m benchmarks.etapas --tamanos 1000 100000 1000000 --etiqueta antes
+    python -m benchmarks.etapas --tamanos 1000 100000 1000000 --base benchmarks/resultados/antes.json
+
+Con --base se imprime el cociente contra la corrida anterior y el proceso
+termina con código 1 si alguna etapa es más lenta que la tolerancia.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from servqual import almacen, estadistica, figuras, metricas, sql, temporal
+from servqual.acumulados import Acumulados
+from servqual.estilo import ESCALA_PURPURA
+from servqual.filtros import IndiceFiltros
+
+from .sintetico import SEMILLA, escribir_parquet
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)  # choropleth_mapbox, igual que el dashboard
+
+DIR_RESULTADOS = Path(__file__).resolve().parent / 'resultados'
+TAMANOS = [1_000, 10_000, 100_000, 1_000_000]
+REPETICIONES = 5
+TOLERANCIA = 1.25  # Cociente contra la base a partir del cual se reporta una regresión
+
+# Filtro representativo: un giro y una región (intersección de dos índices)
+SELECCION = {'Giro_display': ('Educación',), 'Estado_limpio': (),
+             'region_simplificada': ('Centro',), 'antiguedad_grupo': ()}
+
+
+def _figuras(agg):
+    """Figuras de la Visión Operativa con los constructores del dashboard, serializadas como las envía Streamlit"""
+    kpis = agg['kpis']
+    figs = [figuras.mapa_choropleth(agg['estado_stats'], 'NPS_Score', ESCALA_PURPURA),
+            figuras.radar(kpis['radar']), figuras.dona_nps(kpis), figuras.barras_nps(kpis),
+            figuras.barras_segmento(agg['segmentos']['Giro_display'], 'NPS', [1, 10])[0],
+            figuras.barras_oportunidad(metricas.brechas_items(agg['item_stats']).head(5),
+                                       kpis['medias']['score_servqual_total'])]
+    return [fig.to_json() for fig in figs]
+
+
+def etapas(ruta):
+    """[(nombre, función)] sobre el almacén `ruta`; cada función recibe el estado de las anteriores"""
+    sin_incrementos = ruta.parent / '_sin_incrementos'
+    return [
+        ('carga', lambda e: almacen.solo_lectura(almacen.preparar(almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD, ruta, sin_incrementos)))),
+        ('indice', lambda e: IndiceFiltros(e['carga'])),
+        ('acumulados', lambda e: Acumulados.desde_frame(e['carga'])),
+        ('seleccion', lambda e: e['acumulados'].seleccionar(SELECCION)),
+        # Cada derivado por separado y luego todos juntos, como los pide el dashboard
+        ('kpis', lambda e: e['acumulados'].kpis(e['seleccion'])),
+        ('por_estado', lambda e: e['acumulados'].por_estado(e['seleccion'])),
+        ('segmentos', lambda e: e['acumulados'].segmentos(e['seleccion'])),
+        ('nps_grupos', lambda e: e['acumulados'].nps_grupos(e['seleccion'])),
+        ('items', lambda e: e['acumulados'].item_stats(e['seleccion'])),
+        ('resumen', lambda e: e['acumulados'].resumen(e['seleccion'])),
+        ('regresion', lambda e: e['acumulados'].regresion(e['seleccion'])),
+        ('agregados', lambda e: e['acumulados'].agregados(SELECCION)),
+        ('facetas', lambda e: e['acumulados'].facetas(SELECCION)),
+        ('volumen', lambda e: temporal.volumen(e['acumulados'].cubo, SELECCION)),
+        ('estadistica', lambda e: estadistica.calcular_estadistica(e['carga'])),
+        ('figuras', lambda e: _figuras(e['agregados'])),
+        # Misma construcción en DuckDB directo sobre el Parquet (solo si está instalado)
+        *([('acumulados_sql', lambda e: Acumulados.desde_sql(sql.conectar(ruta, sin_incrementos)))] if sql.duckdb else []),
+    ]
+
+
+def medir(n, repeticiones=REPETICIONES, semilla=SEMILLA):
+    """{etapa: {'mediana': s, 'minimo': s}} para el almacén sintético de `n` filas"""
+    ruta = escribir_parquet(n, semilla=semilla)
+    estado, res = {}, {}
+    for nombre, funcion in etapas(ruta):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            estado[nombre] = funcion(estado)
+            tiempos.append(time.perf_counter() - inicio)
+        res[nombre] = {'mediana': statistics.median(tiempos), 'minimo': min(tiempos)}
+    return res
+
+
+def entorno():
+    """Datos de la máquina y librerías para interpretar la comparación"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent).stdout.strip()
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'maquina': platform.machine(),
+            'cpus': os.cpu_count(), 'numpy': np.__version__, 'pandas': pd.__version__}
+
+
+def comparar(actual, base, tolerancia=TOLERANCIA):
+    """Filas (tamaño, etapa, base, actual, cociente) y si alguna supera la tolerancia"""
+    filas, regresion = [], False
+    for n, res in actual['tamanos'].items():
+        for etapa, t in res.items():
+            anterior = base['tamanos'].get(n, {}).get(etapa)
+            if anterior is None:
+                continue
+            cociente = t['mediana'] / anterior['mediana'] if anterior['mediana'] > 0 else np.nan
+            regresion |= bool(cociente > tolerancia)
+            filas.append((n, etapa, anterior['mediana'], t['mediana'], cociente))
+    return filas, regresion
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tiempos por etapa del pipeline SERVQUAL sobre datos sintéticos')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--etiqueta', default=time.strftime('%Y%m%d-%H%M%S'))
+    parser.add_argument('--base', help='JSON de una corrida anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = parser.parse_args()
+
+    resultado = {'entorno': entorno(), 'semilla': args.semilla, 'repeticiones': args.repeticiones, 'tamanos': {}}
+    for n in args.tamanos:
+        resultado['tamanos'][str(n)] = res = medir(n, args.repeticiones, args.semilla)
+        print(f"\n{n:,} filas")
+        for etapa, t in res.items():
+            print(f"  {etapa:<22}{t['mediana'] * 1000:>10.1f} ms  (mín {t['minimo'] * 1000:.1f})")
+
+    DIR_RESULTADOS.mkdir(parents=True, exist_ok=True)
+    salida = DIR_RESULTADOS / f'{args.etiqueta}.json'
+    salida.write_text(json.dumps(resultado, indent=2), encoding='utf-8')
+    print(f"\nResultados: {salida}")
+
+    if args.base:
+        filas, regresion = comparar(resultado, json.loads(Path(args.base).read_text(encoding='utf-8')), args.tolerancia)
+        print(f"\nComparación contra {args.base} (regresión si > {args.tolerancia:.2f}×)")
+        for n, etapa, antes, ahora, cociente in filas:
+            marca = '  ⚠' if cociente > args.tolerancia else ''
+            print(f"  {int(n):>10,} {etapa:<22}{antes * 1000:>10.1f} → {ahora * 1000:>10.1f} ms  {cociente:5.2f}×{marca}")
+        sys.exit(1 if regresion else 0)
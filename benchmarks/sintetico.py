@@ -0,0 +1,134 @@
+"""
+Generador de encuestas sintéticas
+=================================
+Respuestas con el formato de teleton-non-excel.csv, enriquecidas con
+servqual.etl para obtener exactamente el esquema del almacén. El sesgo de
+Estado, Giro, Puesto y Años se toma de la encuesta real (más un suavizado para
+que aparezcan los 32 estados); los ítems comparten un factor latente por
+respondente para que correlaciones, ANOVA y regresión se comporten como en los
+datos reales. Una fracción de Años viene vacía (antiguedad_grupo nulo).
+
+    python -m benchmarks.sintetico 1000000 benchmarks/datos/sintetico_1000000.parquet
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from servqual.almacen import ESQUEMA, a_esquema
+from servqual.etl import RUTA_CRUDO, coordenadas_estados, enriquecer
+from servqual.variables import vars_servqual
+
+DIR_DATOS = Path(__file__).resolve().parent / 'datos'
+SEMILLA = 20250401
+FILAS_POR_BLOQUE = 250_000
+NULOS_ANOS = 0.03   # Años sin contestar -> antiguedad_grupo nulo
+NULOS_ITEM = 0.004  # Como FI_3 en la encuesta real
+INICIO = pd.Timestamp('2025-04-01 08:00:00')
+DIAS = 28
+
+# (columna cruda, máximo de la escala)
+OUTCOMES = [('D_1', 10), ('R_12', 10), ('C_1', 5), ('Info', 10)]
+
+
+def _frecuencias(serie, extra=()):
+    """Valores y probabilidades empíricas; `extra` agrega valores con peso de una respuesta"""
+    conteos = serie.value_counts()
+    for v in extra:
+        if v not in conteos.index:
+            conteos[v] = 1
+    return conteos.index.to_numpy(), (conteos / conteos.sum()).to_numpy()
+
+
+def perfil(ruta_crudo=RUTA_CRUDO, semilla=SEMILLA):
+    """Distribuciones de la encuesta real que reproduce el generador y efectos fijos por estado y giro"""
+    real = pd.read_csv(ruta_crudo, encoding='utf-8-sig')
+    res = {
+        'Estado': _frecuencias(real['Estado'], coordenadas_estados),
+        'Giro': _frecuencias(real['Giro']),
+        'Puesto': _frecuencias(real['Puesto']),
+        'Años': _frecuencias(real['Años']),
+        'medias': real[vars_servqual + [o for o, _ in OUTCOMES]].mean(),
+    }
+    rng = np.random.default_rng(semilla)
+    res['efectos'] = {'Estado': rng.normal(0, 0.25, len(res['Estado'][0])), 'Giro': rng.normal(0, 0.2, len(res['Giro'][0]))}
+    return res
+
+
+def _escala(rng, base, latente, maximo, n, ruido=0.6):
+    """Respuesta entera 1..maximo alrededor de `base` desplazada por el factor latente"""
+    return np.clip(np.rint(base + (latente + rng.normal(0, ruido, n)) * maximo / 5), 1, maximo).astype(np.int8)
+
+
+def generar_crudo(n, semilla=SEMILLA, perfil_real=None):
+    """DataFrame crudo (columnas de teleton-non-excel.csv) con `n` respuestas"""
+    perfil_real = perfil_real or perfil()
+    rng = np.random.default_rng(semilla)
+    raw = pd.DataFrame(index=pd.RangeIndex(n))
+    segundos = np.sort(rng.integers(0, DIAS * 86400, n))
+    raw['timestamp'] = (INICIO + pd.to_timedelta(segundos, unit='s')).strftime('%m/%d/%Y %H:%M:%S')
+
+    # Factor latente por respondente más un efecto por estado y por giro
+    categorias = {}
+    for col in ['Estado', 'Giro', 'Puesto']:
+        valores, p = perfil_real[col]
+        codigos = rng.choice(len(valores), size=n, p=p)
+        categorias[col] = codigos
+        raw[col] = pd.Categorical.from_codes(codigos, categories=valores)
+    efectos = perfil_real['efectos']
+    latente = rng.normal(0, 0.4, n) + efectos['Estado'][categorias['Estado']] + efectos['Giro'][categorias['Giro']]
+
+    medias = perfil_real['medias']
+    for col in vars_servqual:
+        item = pd.array(_escala(rng, medias[col], latente, 5, n), dtype='Int8')
+        item[rng.random(n) < NULOS_ITEM] = pd.NA
+        raw[col] = item
+    for col, maximo in OUTCOMES:
+        raw[col] = _escala(rng, medias[col], latente * 0.6, maximo, n, ruido=0.35)
+
+    valores, p = perfil_real['Años']
+    anos = pd.array(rng.choice(valores, size=n, p=p), dtype='Int16')
+    anos[rng.random(n) < NULOS_ANOS] = pd.NA
+    raw['Años'] = anos
+    return raw[['timestamp', *vars_servqual, *[o for o, _ in OUTCOMES], 'Años', 'Giro', 'Puesto', 'Estado']]
+
+
+def generar(n, semilla=SEMILLA):
+    """Respuestas sintéticas enriquecidas (columnas de teleton_enriched.csv)"""
+    return enriquecer(generar_crudo(n, semilla))
+
+
+def ruta_dataset(n):
+    return DIR_DATOS / f'sintetico_{n}.parquet'
+
+
+def escribir_parquet(n, ruta=None, semilla=SEMILLA, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Almacén sintético de `n` filas con ESQUEMA, escrito por bloques; reutiliza el archivo si ya existe"""
+    ruta = Path(ruta or ruta_dataset(n))
+    if ruta.exists():
+        return ruta
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(f"{ruta}.{os.getpid()}.tmp")
+    perfil_real = perfil(semilla=semilla)
+    semillas = np.random.SeedSequence(semilla).spawn(-(-n // filas_por_bloque))
+    with pq.ParquetWriter(tmp, ESQUEMA, compression='zstd') as escritor:
+        for i, s in enumerate(semillas):
+            filas = min(filas_por_bloque, n - i * filas_por_bloque)
+            out = enriquecer(generar_crudo(filas, s, perfil_real))
+            escritor.write_table(a_esquema(pa.Table.from_pandas(out, preserve_index=False)))
+    os.replace(tmp, ruta)
+    return ruta
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Genera un almacén Parquet con respuestas SERVQUAL sintéticas')
+    parser.add_argument('filas', type=int)
+    parser.add_argument('salida', nargs='?', default=None)
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    args = parser.parse_args()
+    print(f"Generado: {escribir_parquet(args.filas, args.salida, args.semilla)}")
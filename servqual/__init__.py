@@ -0,0 +1,8 @@
+"""
+Paquete SERVQUAL - Fundación Teletón
+====================================
+Lógica de datos y métricas compartida por el dashboard y los procesos batch.
+No depende de Streamlit: `from servqual import metricas` basta para usarla en workers.
+"""
+
+from .metricas import analisis_estadistico, vision_operativa
@@ -0,0 +1,310 @@
+"""
+Estadísticas suficientes por segmento
+=====================================
+Por cada celda (organización × estado × región × antigüedad) se guardan n, el
+conteo, la suma y la suma de cuadrados de cada ítem, score y outcome, los
+conteos por categoría NPS, el histograma de las variables del resumen (ver
+servqual.cuantiles) y los productos cruzados de las regresiones del NPS (ver
+servqual.regresion). Medias, desviaciones, cuantiles, NPS y agregados por estado
+o segmento se derivan de las celdas, así que agregar respuestas nuevas solo
+cuesta lo proporcional a esas filas.
+
+El cubo guarda las mismas sumas (sin histogramas ni regresiones) por celda y
+fecha; las celdas son su enrollado sobre fecha más ese detalle, que solo existe
+a ese nivel.
+La serie de volumen sale del cubo (servqual.temporal).
+
+Se guardan en data/cache/acumulados.parquet y acumulados_cubo.parquet junto con
+la versión de datos.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .bootstrap import intervalos_nps
+from .cuantiles import VARIABLES_RESUMEN, contenedores, cuantil, histogramas
+from .estadistica import DIR_CACHE
+from .filtros import DIMENSIONES_FILTRO, facetas, seleccionar_celdas
+from .geo import ESTADO_GEOJSON_MAP
+from .metricas import confianza, nps_desde_conteos, nps_ponderado, porcentaje_normalizado
+from .perfil import medir
+from .regresion import MODELOS, ajustar, columnas as columnas_ols, momentos
+from .variables import (grupos_segmento, items_dimension, items_names, metricas_segmento,
+                        vars_scores, vars_servqual)
+
+RUTA_ACUMULADOS = DIR_CACHE / 'acumulados.parquet'
+_FORMATO = 3
+
+VARIABLES = vars_servqual + vars_scores + ['score_servqual_total', 'D_1', 'NPS', 'C_1', 'INFO']
+CATEGORIAS_NPS = ['Promotor', 'Pasivo', 'Detractor']
+HISTOGRAMAS = {v: [f'{v}_h{j}' for j in range(len(contenedores(v)))] for v in VARIABLES_RESUMEN}
+_PRIMEROS = ['lat', 'long']  # Constantes por estado, se conservan para el mapa
+
+
+def _llave(columna):
+    """Fechas tal cual; categóricas como objeto (nulos incluidos como celda propia)"""
+    return columna if pd.api.types.is_datetime64_any_dtype(columna) else columna.astype(object)
+
+
+def estadisticas_suficientes(df, claves=DIMENSIONES_FILTRO, con_histogramas=True):
+    """Celdas de `df`: claves, n, {var}_n / {var}_s / {var}_s2, conteos NPS, histogramas {var}_h{j} y Z'Z ols_*
+    (estos dos últimos solo con `con_histogramas`)"""
+    llaves = pd.DataFrame({k: _llave(df[k]) for k in claves})
+    ids = llaves.groupby(claves, dropna=False, sort=False).ngroup().to_numpy()
+    n_celdas = int(ids.max()) + 1 if len(ids) else 0
+    primeras = np.unique(ids, return_index=True)[1]
+
+    valores = df[VARIABLES].to_numpy(dtype='float64', na_value=np.nan)
+    valido = ~np.isnan(valores)
+    valores = np.where(valido, valores, 0.0)
+    suma = lambda pesos=None: np.bincount(ids, weights=pesos, minlength=n_celdas)
+    columnas = {'n': suma()}
+    for i, v in enumerate(VARIABLES):
+        columnas[f'{v}_n'] = suma(valido[:, i])
+        columnas[f'{v}_s'] = suma(valores[:, i])
+        columnas[f'{v}_s2'] = suma(valores[:, i] ** 2)
+    for c in CATEGORIAS_NPS:
+        columnas[c] = suma((df['nps_categoria'] == c).to_numpy(dtype='float64'))
+    for c in _PRIMEROS:
+        columnas[c] = pd.Series(df[c].to_numpy(dtype='float64', na_value=np.nan)).groupby(ids).first().to_numpy()
+    bloques = [llaves.iloc[primeras].reset_index(drop=True), pd.DataFrame(columnas)]
+    for v, nombres in (HISTOGRAMAS.items() if con_histogramas else []):
+        bloques.append(pd.DataFrame(histogramas(df[v].to_numpy(dtype='float64', na_value=np.nan), v, ids, n_celdas),
+                                    columns=nombres))
+    for modelo in (MODELOS if con_histogramas else []):
+        bloques.append(pd.DataFrame(momentos(df, modelo, ids, n_celdas)))
+    return pd.concat(bloques, axis=1)
+
+
+def _combinar(celdas, claves):
+    sumas = [c for c in celdas.columns if c not in claves and c not in _PRIMEROS]
+    g = celdas.groupby(claves, dropna=False, sort=False)
+    return pd.concat([g[sumas].sum(), g[_PRIMEROS].first()], axis=1).reset_index()
+
+
+def _ruta_cubo(ruta):
+    return ruta.with_name(f'{ruta.stem}_cubo{ruta.suffix}')
+
+
+def _totales(celdas, columnas):
+    """Suma de columnas sobre las celdas (Series)"""
+    return pd.Series(celdas[columnas].to_numpy(dtype='float64').sum(axis=0), index=columnas)
+
+
+def _columnas(sumas, variables, sufijo):
+    return sumas[[f'{v}_{sufijo}' for v in variables]].to_numpy(dtype='float64')
+
+
+def _por_variable(sumas, valores, variables):
+    """DataFrame (celdas/grupos × variables) o Series (variables) según la forma de `sumas`"""
+    if sumas.ndim == 1:
+        return pd.Series(valores, index=variables)
+    return pd.DataFrame(valores, index=sumas.index, columns=variables)
+
+
+def _medias(sumas, variables):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return _por_variable(sumas, _columnas(sumas, variables, 's') / _columnas(sumas, variables, 'n'), variables)
+
+
+def _desviaciones(sumas, variables):
+    n, s, s2 = (_columnas(sumas, variables, x) for x in ('n', 's', 's2'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return _por_variable(sumas, np.sqrt(((s2 - s * s / n) / (n - 1)).clip(min=0)), variables)
+
+
+def _conteos_nps(sumas):
+    """(promotores, detractores, respuestas con categoría NPS) por fila"""
+    return (sumas['Promotor'].to_numpy(), sumas['Detractor'].to_numpy(),
+            sumas[CATEGORIAS_NPS].sum(axis=1).to_numpy())
+
+
+class Acumulados:
+    """Celdas de estadísticas suficientes y cubo por fecha, con actualización incremental"""
+
+    def __init__(self, celdas, cubo, claves=DIMENSIONES_FILTRO, version=None):
+        self.celdas = celdas
+        self.cubo = cubo
+        self.claves = list(claves)
+        self.version = version
+
+    @classmethod
+    def desde_frame(cls, df, claves=DIMENSIONES_FILTRO, version=None):
+        return cls(estadisticas_suficientes(df, claves),
+                   estadisticas_suficientes(df, [*claves, 'fecha'], con_histogramas=False), claves, version)
+
+    @classmethod
+    def desde_sql(cls, con=None, claves=DIMENSIONES_FILTRO, version=None):
+        """Igual que desde_frame, pero las sumas se calculan en DuckDB sobre el almacén (servqual.sql)"""
+        from .sql import conectar, estadisticas_suficientes as suficientes_sql
+        con = con or conectar()
+        return cls(suficientes_sql(con, claves),
+                   suficientes_sql(con, [*claves, 'fecha'], con_histogramas=False), claves, version)
+
+    def agregar(self, df_nuevo, version=None):
+        """Suma las celdas y el cubo de las filas nuevas (costo proporcional a df_nuevo)"""
+        nuevo = Acumulados.desde_frame(df_nuevo, self.claves)
+        self.celdas = _combinar(pd.concat([self.celdas, nuevo.celdas], ignore_index=True), self.claves)
+        self.cubo = _combinar(pd.concat([self.cubo, nuevo.cubo], ignore_index=True), [*self.claves, 'fecha'])
+        self.version = version
+        return self
+
+    def seleccionar(self, seleccion):
+        """Celdas que cumplen {columna: valor(es)}; 'Todos', None o [] no filtran"""
+        return seleccionar_celdas(self.celdas, seleccion)
+
+    def facetas(self, seleccion):
+        """Respuestas por opción de cada filtro, dados los demás filtros activos"""
+        return facetas(self.celdas, seleccion, self.claves)
+
+    # Derivados -------------------------------------------------------------
+    def kpis(self, celdas):
+        """NPS, porcentajes normalizados (0-100%), conteos NPS y medias por dimensión"""
+        t = _totales(celdas, ['n', *CATEGORIAS_NPS, *[f'{v}_{x}' for v in VARIABLES for x in 'ns']])
+        medias = _medias(t, VARIABLES)
+        hay = t['n'] > 0
+        return {
+            'nps': nps_desde_conteos(t['Promotor'], t['Detractor'], t[CATEGORIAS_NPS].sum()),
+            'satisfaccion': porcentaje_normalizado(medias['D_1'], 10) if hay else 0,
+            'calidad': porcentaje_normalizado(medias['C_1'], 5) if hay else 0,
+            'servqual': porcentaje_normalizado(medias['score_servqual_total'], 5) if hay else 0,
+            'info': porcentaje_normalizado(medias['INFO'], 10) if hay else 0,
+            'n_promotores': int(t['Promotor']),
+            'n_pasivos': int(t['Pasivo']),
+            'n_detractores': int(t['Detractor']),
+            'radar': [medias[v] for v in vars_scores],
+            'medias': medias[metricas_segmento],
+        }
+
+    def por_estado(self, celdas, medias=('D_1', 'C_1', 'score_servqual_total')):
+        """Por estado: medias, n, NPS_Score, confianza, NPS_normalizado, IC bootstrap del NPS, lat/long y estado_geojson"""
+        celdas = celdas.dropna(subset=['Estado_limpio'])
+        g = celdas.groupby('Estado_limpio')
+        sumas = g[['n', *CATEGORIAS_NPS, *[f'{m}_{x}' for m in medias for x in 'ns']]].sum()
+        res = _medias(sumas, medias)
+        res[_PRIMEROS] = g[_PRIMEROS].first()
+        res['estado_geojson'] = res.index.map(ESTADO_GEOJSON_MAP)
+        res['n'] = sumas['n'].astype(int)
+        res = res.reset_index()
+        res['NPS_Score'] = nps_desde_conteos(*_conteos_nps(sumas))
+        res['confianza'] = confianza(res['n'].to_numpy())
+        res['NPS_normalizado'] = nps_ponderado(res['NPS_Score'], res['n'].to_numpy())
+        res['NPS_IC_inf'], res['NPS_IC_sup'] = intervalos_nps(*_conteos_nps(sumas))
+        return res
+
+    def nps_grupos(self, celdas, grupos=('Giro_display', 'region_simplificada')):
+        """{grupo: n, NPS_Score e IC bootstrap por valor del grupo}"""
+        res = {}
+        for grupo in grupos:
+            sumas = celdas.dropna(subset=[grupo]).groupby(grupo)[['n', *CATEGORIAS_NPS]].sum()
+            tabla = pd.DataFrame({'n': sumas['n'].astype(int),
+                                  'NPS_Score': nps_desde_conteos(*_conteos_nps(sumas))}, index=sumas.index)
+            tabla['NPS_IC_inf'], tabla['NPS_IC_sup'] = intervalos_nps(*_conteos_nps(sumas))
+            res[grupo] = tabla.reset_index()
+        return res
+
+    def segmentos(self, celdas, metricas=metricas_segmento, grupos=grupos_segmento):
+        """{grupo: (DataFrame de medias por valor del grupo, Series de medias globales)}"""
+        res = {}
+        for grupo in grupos:
+            sub = celdas.dropna(subset=[grupo])
+            sumas = sub.groupby(grupo)[[f'{m}_{x}' for m in metricas for x in 'ns']].sum()
+            res[grupo] = (_medias(sumas, metricas), _medias(sumas.sum(), metricas))
+        return res
+
+    def item_stats(self, celdas):
+        """Media y desviación por ítem con nombre y dimensión, de menor a mayor media"""
+        t = _totales(celdas, [f'{v}_{x}' for v in vars_servqual for x in ('n', 's', 's2')])
+        item_stats = pd.DataFrame({'mean': _medias(t, vars_servqual), 'std': _desviaciones(t, vars_servqual)})
+        item_stats['nombre'] = item_stats.index.map(items_names)
+        item_stats['dimension'] = item_stats.index.map(items_dimension)
+        return item_stats.sort_values('mean')
+
+    def resumen(self, celdas, variables=VARIABLES_RESUMEN):
+        """Media, mediana, desviación e IQR de outcomes y scores: media y desviación de las sumas, mediana e IQR del histograma"""
+        t = _totales(celdas, [c for v in variables for c in [f'{v}_n', f'{v}_s', f'{v}_s2', *HISTOGRAMAS[v]]])
+        medias, desv = _medias(t, variables), _desviaciones(t, variables)
+        res = {}
+        for v in variables:
+            conteos = t[HISTOGRAMAS[v]].to_numpy()
+            res[v] = {
+                'Media': medias[v],
+                'Mediana': cuantil(conteos, v, 0.5),
+                'Desv.Est.': desv[v],
+                'IQR': f"{cuantil(conteos, v, 0.25):.1f}-{cuantil(conteos, v, 0.75):.1f}"
+            }
+        return res
+
+    def regresion(self, celdas, modelos=MODELOS):
+        """{modelo: resultado OLS del NPS} (ver regresion.ajustar); None si hay 20 casos completos o menos"""
+        return {modelo: ajustar(_totales(celdas, columnas_ols(modelo)), modelo) for modelo in modelos}
+
+    def agregados(self, seleccion=None):
+        """n, kpis, resumen, estado_stats, segmentos, nps_grupos, item_stats y regresion de la selección (sin leer filas)"""
+        celdas = self.seleccionar(seleccion)
+        res = {'n': int(celdas['n'].sum())}
+        for nombre, calcular in [('kpis', self.kpis), ('resumen', self.resumen), ('estado_stats', self.por_estado),
+                                 ('segmentos', self.segmentos), ('nps_grupos', self.nps_grupos),
+                                 ('item_stats', self.item_stats), ('regresion', self.regresion)]:
+            with medir(nombre):
+                res[nombre] = calcular(celdas)
+        return res
+
+    # Persistencia ----------------------------------------------------------
+    def guardar(self, ruta=RUTA_ACUMULADOS):
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        # El cubo primero: las celdas (que se leen primero) solo cambian con el cubo ya escrito
+        for destino, frame in [(_ruta_cubo(ruta), self.cubo), (ruta, self.celdas)]:
+            tabla = pa.Table.from_pandas(frame, preserve_index=False)
+            tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}),
+                                                   b'servqual_version': str(self.version).encode(),
+                                                   b'servqual_formato': str(_FORMATO).encode()})
+            tmp = destino.with_suffix(f'.{os.getpid()}.tmp')
+            pq.write_table(tabla, tmp)
+            os.replace(tmp, destino)
+        return ruta
+
+    @staticmethod
+    def _leer_tabla(ruta, claves):
+        tabla = pq.read_table(ruta)
+        metadatos = tabla.schema.metadata or {}
+        if metadatos.get(b'servqual_formato') != str(_FORMATO).encode():
+            raise ValueError(f"{ruta}: formato de acumulados distinto de {_FORMATO}")
+        frame = tabla.to_pandas()
+        for k in claves:
+            frame[k] = frame[k].astype(object)
+        return frame, metadatos.get(b'servqual_version', b'').decode() or None
+
+    @classmethod
+    def leer(cls, ruta=RUTA_ACUMULADOS, claves=DIMENSIONES_FILTRO):
+        celdas, version = cls._leer_tabla(ruta, claves)
+        cubo, version_cubo = cls._leer_tabla(_ruta_cubo(ruta), claves)
+        if version_cubo != version:
+            raise ValueError(f"{ruta}: cubo de otra versión de datos")
+        return cls(celdas, cubo, claves, version)
+
+
+def leer_acumulados(version, ruta=RUTA_ACUMULADOS):
+    """Acumulados guardados si corresponden a `version`; None si faltan o están desfasados"""
+    try:
+        acum = Acumulados.leer(ruta)
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+    return acum if acum.version == version else None
+
+
+def cargar_acumulados(df, version, ruta=RUTA_ACUMULADOS):
+    """Acumulados de la versión; si no están guardados se calculan (desde `df` o en DuckDB) y se guardan"""
+    from .sql import usar_duckdb
+    acum = leer_acumulados(version, ruta)
+    if acum is None:
+        acum = Acumulados.desde_sql(version=version) if usar_duckdb() else Acumulados.desde_frame(df, version=version)
+        try:
+            acum.guardar(ruta)
+        except OSError:
+            pass  # Directorio de solo lectura: se usa el resultado en memoria
+    return acum
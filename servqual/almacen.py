@@ -0,0 +1,236 @@
+"""
+Almacén columnar del dataset enriquecido
+========================================
+El CSV enriquecido se convierte una sola vez a Parquet con un esquema explícito
+(ítems en int8, categóricas como diccionario) y el dashboard lo lee con
+memory-map, proyectando solo las columnas que usa. Las respuestas nuevas se
+agregan como archivos Parquet en data/incrementos/ (ver servqual.ingesta).
+
+Convertir manualmente: python -m servqual.almacen
+"""
+
+import hashlib
+import os
+import time
+from functools import lru_cache, wraps
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from .geo import ESTADO_GEOJSON_MAP
+
+RAIZ = Path(__file__).resolve().parent.parent
+RUTA_CSV = RAIZ / 'data' / 'teleton_enriched.csv'
+RUTA_PARQUET = RAIZ / 'data' / 'teleton_enriched.parquet'
+DIR_INCREMENTOS = RAIZ / 'data' / 'incrementos'
+
+_CAT = pa.dictionary(pa.int8(), pa.string())
+
+ESQUEMA = pa.schema([
+    # Temporales
+    ('timestamp', pa.timestamp('s')), ('fecha', pa.date32()), ('mes', pa.int8()),
+    ('dia_semana', _CAT), ('dia_semana_num', pa.int8()), ('hora', pa.int8()), ('turno', _CAT),
+    # Ítems SERVQUAL (1-5)
+    ('AT_1', pa.int8()), ('AT_2', pa.int8()), ('FI_1', pa.int8()), ('FI_2', pa.int8()), ('FI_3', pa.int8()),
+    ('R_1', pa.int8()), ('R_2', pa.int8()), ('R_3', pa.int8()),
+    ('E_1', pa.int8()), ('E_2', pa.int8()), ('E_3', pa.int8()), ('E_4', pa.int8()),
+    # Scores
+    ('score_tangibles', pa.float64()), ('score_fiabilidad', pa.float64()),
+    ('score_responsiveness', pa.float64()), ('score_empatia', pa.float64()),
+    ('score_servqual_total', pa.float64()),
+    # Outcomes
+    ('D_1', pa.int8()), ('satisfaccion_nivel', _CAT), ('NPS', pa.int8()), ('nps_categoria', _CAT),
+    ('C_1', pa.int8()), ('calidad_nivel', _CAT), ('INFO', pa.int8()), ('info_nivel', _CAT),
+    # Demográficas
+    ('AÑOS', pa.int16()), ('antiguedad_grupo', _CAT), ('Giro', _CAT), ('Puesto', _CAT),
+    # Geográficas
+    ('Estado', _CAT), ('Estado_limpio', _CAT), ('region', _CAT),
+    ('poblacion_millones', pa.float32()), ('pib_per_capita_miles', pa.float32()),
+    ('nivel_economico_estado', _CAT), ('lat', pa.float32()), ('long', pa.float32()),
+    ('region_simplificada', _CAT), ('Giro_corto', _CAT),
+])
+
+# Columnas que consume el dashboard (proyección al leer)
+COLUMNAS_DASHBOARD = [
+    'fecha', 'AT_1', 'AT_2', 'FI_1', 'FI_2', 'FI_3', 'R_1', 'R_2', 'R_3', 'E_1', 'E_2', 'E_3', 'E_4',
+    'score_tangibles', 'score_fiabilidad', 'score_responsiveness', 'score_empatia', 'score_servqual_total',
+    'D_1', 'NPS', 'nps_categoria', 'C_1', 'INFO', 'antiguedad_grupo', 'Giro',
+    'Estado_limpio', 'lat', 'long', 'region_simplificada', 'turno',
+]
+
+
+def _codificar_ordenado(columna, tipo):
+    """Codifica como diccionario con categorías en orden alfabético (igual que groupby sobre texto)"""
+    texto = columna.cast(pa.string())
+    valores = pc.unique(texto).drop_null()
+    valores = valores.take(pc.sort_indices(valores))
+    indices = pc.index_in(texto, value_set=valores).cast(tipo.index_type)
+    return pa.DictionaryArray.from_arrays(indices.combine_chunks(), valores)
+
+
+def a_esquema(tabla):
+    """Tabla Arrow con las columnas y tipos de ESQUEMA (categóricas en orden alfabético)"""
+    columnas = [_codificar_ordenado(tabla[c.name], c.type) if pa.types.is_dictionary(c.type)
+                else tabla[c.name].cast(c.type) for c in ESQUEMA]
+    return pa.Table.from_arrays(columnas, schema=ESQUEMA)
+
+
+def _escribir(tabla, ruta):
+    tmp = Path(f"{ruta}.{os.getpid()}.tmp")
+    pq.write_table(tabla, tmp, compression='zstd')
+    os.replace(tmp, ruta)
+    return ruta
+
+
+def convertir_csv(ruta_csv=RUTA_CSV, ruta_parquet=RUTA_PARQUET):
+    """Convierte el CSV enriquecido a Parquet con ESQUEMA (escritura atómica)"""
+    tabla = pa_csv.read_csv(ruta_csv, convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    return _escribir(a_esquema(tabla), ruta_parquet)
+
+
+def agregar_filas(df, dir_incrementos=DIR_INCREMENTOS):
+    """Guarda filas enriquecidas como un incremento nuevo (no reescribe el histórico)"""
+    dir_incrementos = Path(dir_incrementos)
+    dir_incrementos.mkdir(parents=True, exist_ok=True)
+    tabla = a_esquema(pa.Table.from_pandas(df[ESQUEMA.names], preserve_index=False))
+    return _escribir(tabla, dir_incrementos / f'parte_{time.time_ns()}.parquet')
+
+
+def partes(dir_incrementos=DIR_INCREMENTOS):
+    """Incrementos en orden de llegada"""
+    return sorted(Path(dir_incrementos).glob('parte_*.parquet'))
+
+
+def asegurar_parquet(ruta_csv=RUTA_CSV, ruta_parquet=RUTA_PARQUET):
+    """Genera el Parquet solo si no existe o si el CSV es más reciente"""
+    ruta_csv, ruta_parquet = Path(ruta_csv), Path(ruta_parquet)
+    if not ruta_parquet.exists() or (ruta_csv.exists() and ruta_csv.stat().st_mtime > ruta_parquet.stat().st_mtime):
+        convertir_csv(ruta_csv, ruta_parquet)
+    return ruta_parquet
+
+
+def leer_tabla(columnas=None, ruta_parquet=RUTA_PARQUET, dir_incrementos=DIR_INCREMENTOS):
+    """Tabla Arrow con memory-map y proyección de columnas (histórico + incrementos)"""
+    # Solo el almacén por defecto se deriva del CSV enriquecido (otros, p. ej. los sintéticos, se leen tal cual)
+    base = asegurar_parquet(ruta_parquet=ruta_parquet) if Path(ruta_parquet) == RUTA_PARQUET else ruta_parquet
+    tablas = [pq.read_table(ruta, columns=columnas, memory_map=True) for ruta in [base, *partes(dir_incrementos)]]
+    tabla = tablas[0] if len(tablas) == 1 else pa.concat_tables(tablas)
+    # Cada incremento o row group trae su propio diccionario: se recodifican en un solo orden alfabético
+    for i, campo in enumerate(tabla.schema):
+        if pa.types.is_dictionary(campo.type) and tabla[campo.name].num_chunks > 1:
+            tabla = tabla.set_column(i, campo, _codificar_ordenado(tabla[campo.name], campo.type))
+    return tabla
+
+
+# Enteros compactos con nulos como enteros anulables (Int8/Int16) en lugar de float64
+_TIPOS_PANDAS = {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype()}
+
+
+def leer_dataset(columnas=None, ruta_parquet=RUTA_PARQUET, dir_incrementos=DIR_INCREMENTOS):
+    """DataFrame tipado: Int8/Int16 anulables para escalas, category para categóricas, datetime64 para fechas"""
+    return leer_tabla(columnas, ruta_parquet, dir_incrementos).to_pandas(date_as_object=False,
+                                                                          types_mapper=_TIPOS_PANDAS.get)
+
+
+@lru_cache(maxsize=64)
+def _hash_archivo(ruta, mtime_ns, tamano):
+    h = hashlib.blake2b(digest_size=8)
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def version_dataset(ruta_parquet=RUTA_PARQUET, dir_incrementos=DIR_INCREMENTOS):
+    """Hash del contenido del Parquet y sus incrementos; identifica la versión de los datos en claves de caché"""
+    rutas = [asegurar_parquet(ruta_parquet=ruta_parquet), *partes(dir_incrementos)]
+    hashes = []
+    for ruta in rutas:
+        info = os.stat(ruta)
+        hashes.append(_hash_archivo(str(ruta), info.st_mtime_ns, info.st_size))
+    if len(hashes) == 1:
+        return hashes[0]
+    return hashlib.blake2b('-'.join(hashes).encode(), digest_size=8).hexdigest()
+
+
+GIRO_DISPLAY = {'Teletón (Grupos internos de la Fundación)': 'Teletón', 'Gubernamental': 'Gobierno'}
+
+
+def preparar(df):
+    """Columnas derivadas del dashboard (Giro_display, estado_geojson); no modifica `df`"""
+    if 'Giro_display' not in df:
+        giro = df['Giro'] if isinstance(df['Giro'].dtype, pd.CategoricalDtype) else df['Giro'].astype('category')
+        df = df.assign(Giro_display=giro.cat.rename_categories(lambda g: GIRO_DISPLAY.get(g, g)))
+    if 'estado_geojson' not in df:
+        df = df.assign(estado_geojson=df['Estado_limpio'].map(ESTADO_GEOJSON_MAP).astype('category'))
+    return df
+
+
+class MarcoSoloLectura(pd.DataFrame):
+    """DataFrame compartido entre sesiones: asignar, borrar o insertar columnas, cambiar ejes y las
+    operaciones inplace fallan con TypeError. Lo que se deriva de él (filtros, assign, copy) es un
+    DataFrame normal."""
+
+    _ERROR = "DataFrame compartido de solo lectura: deriva uno nuevo (assign, copy) en lugar de modificarlo"
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def _bloqueado(self, *args, **kwargs):
+        raise TypeError(self._ERROR)
+
+    __setitem__ = __delitem__ = insert = pop = update = _bloqueado
+
+    def __setattr__(self, nombre, valor):
+        if nombre in ('columns', 'index'):
+            self._bloqueado()
+        super().__setattr__(nombre, valor)
+
+
+def _sin_inplace(nombre):
+    metodo = getattr(pd.DataFrame, nombre)
+
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        if kwargs.get('inplace'):
+            self._bloqueado()
+        return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+for _nombre in ('bfill', 'clip', 'drop', 'drop_duplicates', 'dropna', 'eval', 'ffill', 'fillna', 'interpolate',
+                'mask', 'query', 'rename', 'rename_axis', 'replace', 'reset_index', 'set_index', 'sort_index',
+                'sort_values', 'where'):
+    setattr(MarcoSoloLectura, _nombre, _sin_inplace(_nombre))
+
+
+def solo_lectura(df):
+    """MarcoSoloLectura con arreglos de solo lectura para compartir entre sesiones: escribir valores o
+    modificar columnas falla en vez de alterar la copia de todos"""
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy().copy()
+            codigos.flags.writeable = False
+            columnas[col] = pd.Categorical.from_codes(codigos, dtype=serie.dtype)
+        elif isinstance(serie.array, pd.arrays.IntegerArray):  # Int8/Int16 anulables: valores y máscara
+            valores, mascara = serie.array._data.copy(), serie.array._mask.copy()
+            valores.flags.writeable = mascara.flags.writeable = False
+            columnas[col] = pd.arrays.IntegerArray(valores, mascara)
+        elif isinstance(serie.dtype, np.dtype):
+            valores = serie.to_numpy().copy()
+            valores.flags.writeable = False
+            columnas[col] = valores
+        else:
+            columnas[col] = serie.array  # Texto respaldado por Arrow: ya es inmutable
+    return MarcoSoloLectura(columnas, index=df.index, copy=False)
+
+if __name__ == '__main__':
+    print(f"Parquet generado: {convertir_csv()}")
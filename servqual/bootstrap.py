@@ -0,0 +1,71 @@
+"""
+Intervalos bootstrap del NPS
+============================
+Remuestrear n respuestas con reemplazo equivale a sacar los conteos
+(promotores, pasivos, detractores) de una multinomial con las proporciones
+observadas. Así todas las réplicas de todos los grupos salen de una sola llamada
+a numpy y el costo depende de réplicas × grupos, no del número de respuestas.
+
+Opcionalmente las réplicas se reparten en un pool de procesos (SERVQUAL_BOOTSTRAP_PROCESOS),
+creado una sola vez por proceso y reutilizado en cada llamada.
+"""
+
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+REPLICAS = int(os.environ.get('SERVQUAL_BOOTSTRAP_REPLICAS', 2000))
+PROCESOS = int(os.environ.get('SERVQUAL_BOOTSTRAP_PROCESOS', 0))
+NIVEL = 0.95
+SEMILLA = 20250401
+
+_pools = {}
+_lock_pools = threading.Lock()
+
+
+def _pool(procesos):
+    """Pool de `procesos` workers compartido por todas las llamadas del proceso"""
+    with _lock_pools:
+        if procesos not in _pools:
+            _pools[procesos] = ProcessPoolExecutor(procesos)
+        return _pools[procesos]
+
+
+@atexit.register
+def _cerrar_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def replicas_nps(promotores, detractores, total, replicas, semilla=SEMILLA):
+    """Matriz (réplicas × grupos) de NPS remuestreados"""
+    promotores, detractores, total = (np.asarray(x, dtype=np.int64) for x in (promotores, detractores, total))
+    base = np.where(total > 0, total, 1)
+    pvals = np.column_stack([promotores, total - promotores - detractores, detractores]) / base[:, None]
+    pvals[total == 0] = [0, 1, 0]
+    rng = np.random.default_rng(semilla)
+    conteos = rng.multinomial(total, pvals, size=(replicas, len(total)))
+    return (conteos[..., 0] - conteos[..., 2]) / base * 100
+
+
+def intervalos_nps(promotores, detractores, total, replicas=REPLICAS, nivel=NIVEL, procesos=PROCESOS, semilla=SEMILLA):
+    """(inferior, superior) del intervalo percentil por grupo; NaN donde no hay respuestas"""
+    total = np.asarray(total, dtype=np.int64)
+    if len(total) == 0:
+        return np.empty(0), np.empty(0)
+    if procesos and procesos > 1:
+        semillas = np.random.SeedSequence(semilla).spawn(procesos)
+        bloques = [len(b) for b in np.array_split(np.arange(replicas), procesos)]
+        partes = _pool(procesos).map(replicas_nps, *zip(*[(promotores, detractores, total, b, s)
+                                                          for b, s in zip(bloques, semillas)]))
+        nps = np.concatenate(list(partes))
+    else:
+        nps = replicas_nps(promotores, detractores, total, replicas, semilla)
+    alfa = (1 - nivel) / 2
+    inferior, superior = np.percentile(nps, [alfa * 100, (1 - alfa) * 100], axis=0)
+    vacio = total == 0
+    inferior[vacio] = superior[vacio] = np.nan
+    return inferior, superior
@@ -0,0 +1,91 @@
+"""
+Caché LRU con presupuesto de memoria
+====================================
+Guarda resultados por clave (p.ej. versión del dataset + filtros) y desaloja los
+menos usados cuando la suma estimada de bytes supera el presupuesto. Lleva
+contadores de aciertos/fallos. Es segura entre hilos (una sesión de Streamlit por hilo).
+
+Los valores se comparten entre sesiones: quien los lee no debe modificarlos.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+PRESUPUESTO_MB = float(os.environ.get('SERVQUAL_CACHE_MB', 256))
+
+
+def tamano_bytes(obj):
+    """Estimación del tamaño en memoria de un resultado (DataFrames, arrays, contenedores)"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(tamano_bytes(k) + tamano_bytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(tamano_bytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class CacheLRU:
+    """Caché LRU acotada por bytes"""
+
+    def __init__(self, presupuesto_mb=PRESUPUESTO_MB):
+        self.presupuesto = int(presupuesto_mb * 1024 * 1024)
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def __len__(self):
+        return len(self._datos)
+
+    def get(self, clave, defecto=None):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave][0]
+            self.fallos += 1
+            return defecto
+
+    def put(self, clave, valor):
+        tam = tamano_bytes(valor)
+        with self._lock:
+            if clave in self._datos:
+                self.bytes -= self._datos.pop(clave)[1]
+            if tam > self.presupuesto:
+                return valor
+            self._datos[clave] = (valor, tam)
+            self.bytes += tam
+            while self.bytes > self.presupuesto:
+                _, (_, t) = self._datos.popitem(last=False)
+                self.bytes -= t
+                self.desalojos += 1
+        return valor
+
+    def obtener(self, clave, calcular):
+        """Valor en caché o calcular() y guardarlo"""
+        faltante = object()
+        valor = self.get(clave, faltante)
+        if valor is faltante:
+            valor = self.put(clave, calcular())
+        return valor
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {'entradas': len(self._datos), 'bytes': self.bytes, 'presupuesto': self.presupuesto,
+                'aciertos': self.aciertos, 'fallos': self.fallos, 'desalojos': self.desalojos,
+                'tasa_aciertos': self.aciertos / total if total else 0.0}
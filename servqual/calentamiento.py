@@ -0,0 +1,96 @@
+"""
+Precalentamiento de cachés
+==========================
+El primer visitante tras un despliegue pagaría la lectura del dataset, los
+acumulados, el GeoJSON, la pestaña 2 y los agregados de la vista "Todos"; el
+primero de cada estado u organización popular pagaría sus agregados. Dos fases:
+
+- En el despliegue, antes de levantar el servidor: `python -m servqual.calentamiento`
+  deja en disco el Parquet, los acumulados y el sidecar de la pestaña 2 de la
+  versión actual, así que el proceso del dashboard solo los lee.
+- En el servidor: `Calentamiento` ejecuta en un hilo de fondo las tareas que le
+  pasa el dashboard (cachés en memoria de datos, estadística y agregados de la
+  vista por defecto y de las SERVQUAL_CALENTAR combinaciones con más respuestas;
+  0 lo desactiva) y expone su avance para el indicador de la barra lateral.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from . import almacen, geo
+from .acumulados import cargar_acumulados
+from .estadistica import cargar_estadistica
+
+COMBINACIONES = int(os.environ.get('SERVQUAL_CALENTAR', 10))
+
+registro = logging.getLogger('servqual.calentamiento')
+
+
+def combinaciones_frecuentes(acumulados, dimensiones, k=COMBINACIONES):
+    """Vista por defecto y las `k` selecciones de un solo valor con más respuestas ({dimensión: tupla})"""
+    vacia = {dim: () for dim in dimensiones}
+    conteos = [(n, dim, valor) for dim in dimensiones
+               for valor, n in acumulados.celdas.groupby(dim, observed=True)['n'].sum().items() if n > 0]
+    conteos.sort(key=lambda c: -c[0])
+    return [vacia] + [{**vacia, dim: (valor,)} for _, dim, valor in conteos[:k]]
+
+
+class Calentamiento:
+    """Ejecuta tareas (nombre, función) en orden en un hilo de fondo; los errores se registran y no detienen el resto"""
+
+    def __init__(self, tareas):
+        self.tareas = list(tareas)
+        self.hechas = 0
+        self.actual = None
+        self.errores = []
+        self.inicio = self.fin = None
+        self._hilo = threading.Thread(target=self._correr, name='servqual-calentamiento', daemon=True)
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+        self._hilo.start()
+        return self
+
+    def _correr(self):
+        for nombre, funcion in self.tareas:
+            self.actual = nombre
+            try:
+                funcion()
+            except Exception as e:  # Una caché fría no debe tumbar el resto del calentamiento
+                self.errores.append((nombre, repr(e)))
+                registro.warning("calentamiento %s: %r", nombre, e)
+            self.hechas += 1
+        self.actual = None
+        self.fin = time.perf_counter()
+
+    @property
+    def listo(self):
+        return self.fin is not None
+
+    def avance(self):
+        return self.hechas / len(self.tareas) if self.tareas else 1.0
+
+    def segundos(self):
+        return (self.fin or time.perf_counter()) - self.inicio if self.inicio else 0.0
+
+    def esperar(self, timeout=None):
+        self._hilo.join(timeout)
+        return self.listo
+
+
+def calentar_disco():
+    """Parquet, acumulados y sidecar de la pestaña 2 de la versión actual; devuelve la versión"""
+    version = almacen.version_dataset()
+    df = almacen.preparar(almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD))
+    cargar_acumulados(df, version)
+    cargar_estadistica(df, version)
+    geo.cargar_geojson()
+    return version
+
+
+if __name__ == '__main__':
+    inicio = time.perf_counter()
+    version = calentar_disco()
+    print(f"Cachés en disco listas para la versión {version} ({time.perf_counter() - inicio:.1f} s)")
@@ -0,0 +1,68 @@
+"""
+Cuantiles desde histogramas
+===========================
+Las escalas son acotadas: outcomes enteros (1-5, 1-10) y scores que son promedios
+redondeados a 2 decimales (1.00-5.00). Un histograma de conteos por valor basta
+para la mediana y el IQR: es exacto para las escalas discretas y tiene un error
+máximo de medio contenedor (0.005) para valores continuos de los scores.
+
+Los histogramas se suman, así que se combinan entre segmentos o periodos sin
+volver a leer filas. Mismo cuantil lineal que pandas/numpy.
+"""
+
+import numpy as np
+
+from .variables import vars_outcome, vars_scores
+
+# (mínimo, máximo, ancho de contenedor)
+ESCALAS = {
+    'D_1': (1, 10, 1), 'NPS': (1, 10, 1), 'C_1': (1, 5, 1), 'INFO': (1, 10, 1),
+    **{v: (1, 5, 0.01) for v in vars_scores + ['score_servqual_total']},
+}
+
+# Variables de las tablas "Resumen de Métricas"
+VARIABLES_RESUMEN = [o[0] for o in vars_outcome] + vars_scores + ['score_servqual_total']
+
+
+def contenedores(variable):
+    """Valor representativo de cada contenedor"""
+    minimo, maximo, paso = ESCALAS[variable]
+    n = int(round((maximo - minimo) / paso)) + 1
+    return np.round(minimo + np.arange(n) * paso, 2)
+
+
+def indices(valores, variable):
+    """Contenedor de cada valor (fuera de escala se recorta; -1 para nulos)"""
+    minimo, maximo, paso = ESCALAS[variable]
+    valores = np.asarray(valores, dtype='float64')
+    nulos = np.isnan(valores)
+    idx = np.rint((np.clip(np.where(nulos, minimo, valores), minimo, maximo) - minimo) / paso).astype(np.int64)
+    idx[nulos] = -1
+    return idx
+
+
+def histogramas(valores, variable, grupos=None, n_grupos=1):
+    """Conteos (n_grupos × contenedores); `grupos` asigna cada fila a un grupo 0..n_grupos-1"""
+    n_cont = len(contenedores(variable))
+    idx = indices(valores, variable)
+    grupos = np.zeros(len(idx), dtype=np.int64) if grupos is None else np.asarray(grupos, dtype=np.int64)
+    validos = idx >= 0
+    plano = np.bincount(grupos[validos] * n_cont + idx[validos], minlength=n_grupos * n_cont)
+    return plano.reshape(n_grupos, n_cont)
+
+
+def cuantil(conteos, variable, q):
+    """Cuantil q (interpolación lineal) de un histograma; NaN si está vacío"""
+    conteos = np.asarray(conteos)
+    n = conteos.sum()
+    if n == 0:
+        return np.nan
+    valores = contenedores(variable)
+    acumulado = np.cumsum(conteos)
+    h = (n - 1) * q
+    bajo = int(np.floor(h))
+    a = valores[np.searchsorted(acumulado, bajo, side='right')]
+    b = valores[np.searchsorted(acumulado, min(bajo + 1, n - 1), side='right')]
+    t = h - bajo
+    # Misma interpolación que numpy (_lerp)
+    return b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
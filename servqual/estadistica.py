@@ -0,0 +1,153 @@
+"""
+Análisis Estadístico (dataset completo)
+=======================================
+Correlaciones, chi-cuadrada, pruebas t, ANOVA, regresión OLS y la batería de
+comparaciones por segmento (servqual.pruebas) de la pestaña 2.
+Los filtros no aplican, así que los resultados solo dependen de la versión de los
+datos: se calculan una vez y se guardan en data/cache/ (un JSON por hash de datos).
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy.stats import chi2_contingency, f_oneway, ttest_ind
+
+from .perfil import medir
+from .pruebas import bateria
+from .variables import vars_scores
+
+DIR_CACHE = Path(__file__).resolve().parent.parent / 'data' / 'cache'
+_FORMATO = 2
+
+vars_corr = vars_scores + ['D_1', 'NPS', 'C_1']
+orden_antiguedad = ['Nuevo', 'Establecido', 'Veterano']
+
+
+def grupos_ttest(df):
+    """Pares (g1, g2, nombre1, nombre2, variable) de las cuatro pruebas t"""
+    return [
+        (df[df['nps_categoria']=='Promotor']['D_1'].dropna(), df[df['nps_categoria']=='Detractor']['D_1'].dropna(), 'Promotores', 'Detractores', 'Satisfacción'),
+        (df[df['antiguedad_grupo']=='Nuevo']['score_servqual_total'].dropna(), df[df['antiguedad_grupo']=='Veterano']['score_servqual_total'].dropna(), 'Nuevos', 'Veteranos', 'SERVQUAL'),
+        (df[df['Giro']=='Empresa']['D_1'].dropna(), df[df['Giro']=='Persona física']['D_1'].dropna(), 'Empresa', 'Persona física', 'Satisfacción'),
+        (df[df['region_simplificada']=='Centro']['NPS'].dropna(), df[df['region_simplificada']!='Centro']['NPS'].dropna(), 'Centro', 'Otras', 'NPS')
+    ]
+
+
+def ttest(g1, g2, n1, n2, var):
+    """Prueba t de Student con d de Cohen (None si algún grupo tiene menos de 5 casos)"""
+    if len(g1)<5 or len(g2)<5: return None
+    t, p = ttest_ind(g1, g2)
+    ps = np.sqrt(((len(g1)-1)*g1.std()**2 + (len(g2)-1)*g2.std()**2) / (len(g1)+len(g2)-2))
+    d = (g1.mean() - g2.mean()) / ps if ps>0 else 0
+    return {'n1':n1, 'n2':n2, 'm1':g1.mean(), 'm2':g2.mean(), 'c1':len(g1), 'c2':len(g2), 't':t, 'p':p, 'd':d, 'var':var}
+
+
+def _chi2(cont):
+    chi2, p, dof, _ = chi2_contingency(cont)
+    return {'chi2': chi2, 'p': p, 'gl': dof, 'pct': cont.div(cont.sum(axis=1), axis=0) * 100}
+
+
+def _anova(df, col, grupos):
+    muestras = [df[df[col]==g]['D_1'].dropna() for g in grupos]
+    muestras = [g for g in muestras if len(g)>=3]
+    if len(muestras) < 2:
+        return None
+    f, p = f_oneway(*muestras)
+    return {'F': f, 'p': p}
+
+
+def _regresion(df):
+    df_rg = df[vars_scores + ['NPS']].dropna()
+    if len(df_rg) <= 20:
+        return None
+    mod = sm.OLS(df_rg['NPS'], sm.add_constant(df_rg[vars_scores])).fit()
+    return {'rsquared': mod.rsquared, 'fvalue': mod.fvalue, 'f_pvalue': mod.f_pvalue,
+            'params': mod.params.to_dict(), 'pvalues': mod.pvalues.to_dict()}
+
+
+def tablas_chi2(df):
+    """Tablas de contingencia de las pruebas chi² (giro y antigüedad contra categoría NPS)"""
+    giro_chi = df['Giro'].cat.rename_categories(lambda g: 'Teletón' if g == 'Teletón (Grupos internos de la Fundación)' else g).rename('Giro_display')
+    df_c2 = df.dropna(subset=['antiguedad_grupo', 'nps_categoria'])
+    return {'chi2_giro': pd.crosstab(giro_chi, df['nps_categoria']),
+            'chi2_antiguedad': pd.crosstab(df_c2['antiguedad_grupo'], df_c2['nps_categoria'])}
+
+
+def calcular_estadistica(df, tablas=None):
+    """Todos los resultados de la pestaña 2 sobre el dataset completo (`tablas`: contingencias ya calculadas)"""
+    tablas = tablas or tablas_chi2(df)
+    df_a = df.dropna(subset=['antiguedad_grupo'])
+    df_r = df.dropna(subset=['region_simplificada'])
+    pruebas = {
+        'corr': lambda: df[vars_corr].corr(),
+        'chi2_giro': lambda: _chi2(tablas['chi2_giro']),
+        'chi2_antiguedad': lambda: _chi2(tablas['chi2_antiguedad']),
+        'ttests': lambda: [ttest(*args) for args in grupos_ttest(df)],
+        'anova': lambda: {
+            'Giro_display': _anova(df, 'Giro_display', df['Giro_display'].dropna().unique()),
+            'antiguedad_grupo': _anova(df_a, 'antiguedad_grupo', orden_antiguedad),
+            'region_simplificada': _anova(df_r, 'region_simplificada', df_r['region_simplificada'].unique()),
+        },
+        'regresion': lambda: _regresion(df),
+        'comparaciones': lambda: bateria(df),
+    }
+    res = {}
+    for nombre, calcular in pruebas.items():
+        with medir(nombre):
+            res[nombre] = calcular()
+    return res
+
+
+# Persistencia JSON: DataFrames como {'__df__': split}, numpy como escalares nativos
+def _a_json(obj):
+    if isinstance(obj, pd.DataFrame):
+        return {'__df__': obj.to_dict(orient='split'), 'nombres': [obj.index.name, obj.columns.name]}
+    if isinstance(obj, dict):
+        return {k: _a_json(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_a_json(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def _de_json(obj):
+    if isinstance(obj, dict):
+        if '__df__' in obj:
+            s = obj['__df__']
+            res = pd.DataFrame(s['data'], index=s['index'], columns=s['columns'])
+            res.index.name, res.columns.name = obj['nombres']
+            return res
+        return {k: _de_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_de_json(v) for v in obj]
+    return obj
+
+
+def ruta_sidecar(version):
+    return DIR_CACHE / f'estadistica_v{_FORMATO}_{version}.json'
+
+
+def cargar_estadistica(df, version):
+    """Resultados desde el sidecar de la versión; si no existe se calculan y se guardan"""
+    ruta = ruta_sidecar(version)
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return _de_json(json.load(f))
+    except (OSError, ValueError):
+        pass
+    from .sql import conectar, tablas_chi2 as tablas_sql, usar_duckdb
+    res = calcular_estadistica(df, tablas_sql(conectar()) if usar_duckdb() else None)
+    try:
+        DIR_CACHE.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(_a_json(res), f, ensure_ascii=False)
+        os.replace(tmp, ruta)
+    except OSError:
+        pass  # Directorio de solo lectura: se usa el resultado en memoria
+    return res
@@ -0,0 +1,72 @@
+"""
+Paleta y estilos
+================
+Colores de marca, escalas de los mapas y el CSS de las tarjetas (KPIs, rankings,
+oportunidades, cajas de estadísticos). Los comparten el dashboard y los reportes
+HTML estáticos (servqual.reportes) para que se vean igual.
+"""
+
+PALETA = {
+    'morado_primario': '#5A0077', 'morado_profundo': '#3B0050', 'morado_claro': '#A45DB4',
+    'amarillo': '#F9C400', 'naranja': '#FF7A21', 'turquesa': '#009EC6',
+    'rojo': '#D9351A', 'blanco': '#FAFAFA', 'gris_claro': '#F2F2F2',
+    'gris_medio': '#9E9E9E', 'gris_apagado': '#BDBDBD', 'gris_oscuro': '#424242',
+}
+
+ESCALA_NPS = ['#FFF4C2', '#FFE88F', '#FFD054', '#FFB028', '#FF7A21', '#D9351A']
+ESCALA_PURPURA = ['#F3E6F7', '#D9B6E3', '#B987CE', '#8C4DAE', '#5A0077', '#3B0050']
+ESCALA_DIVERGENTE = ['#007F8A', '#22A7A6', '#83D3CD', '#E7E0F0', '#A45DB4', '#5A0077']
+ESCALA_VOLUMEN = ['#E8F5E9', '#A5D6A7', '#66BB6A', '#43A047', '#2E7D32', '#1B5E20']  # Verde para volumen
+CATEGORICA_BRAND = ['#5A0077', '#F9C400', '#FF7A21', '#009EC6', '#D43F8D', '#3F51B5']
+CATEGORICA_MONO = ['#5A0077', '#7B1FA2', '#9C27B0', '#AB47BC', '#BA68C8', '#CE93D8']
+
+ESTILOS = f"""
+<style>
+    .main {{background-color: {PALETA['blanco']} !important;}}
+    .kpi-card {{
+        background: linear-gradient(135deg, {PALETA['gris_claro']} 0%, {PALETA['blanco']} 100%);
+        border: 1px solid #e0e0e0; border-radius: 12px; padding: 20px; text-align: center;
+        box-shadow: 0 2px 8px rgba(90,0,119,0.1);
+    }}
+    .kpi-grid {{display: grid; gap: 1rem;}}
+    .kpi-value {{font-size: 2.5rem; font-weight: 700; color: {PALETA['morado_primario']}; margin: 10px 0;}}
+    .kpi-label {{font-size: 0.9rem; color: {PALETA['gris_oscuro']}; text-transform: uppercase;}}
+    .section-title {{
+        font-size: 1.3rem; font-weight: 600; color: {PALETA['morado_profundo']};
+        margin: 30px 0 15px 0; padding-bottom: 10px; border-bottom: 2px solid {PALETA['morado_claro']};
+    }}
+    .insight-card {{
+        background-color: {PALETA['gris_claro']}; border-radius: 8px;
+        padding: 15px; margin: 10px 0; border-left: 4px solid {PALETA['morado_primario']};
+    }}
+    .stat-box {{
+        background-color: {PALETA['gris_claro']}; border: 1px solid #e0e0e0;
+        border-radius: 6px; padding: 12px; font-family: monospace; font-size: 0.85rem;
+    }}
+    .warning-box {{
+        background-color: #fff3cd; border: 1px solid #ffc107;
+        border-radius: 8px; padding: 15px; margin: 15px 0; color: #856404;
+    }}
+    .note-box {{
+        background-color: #e3f2fd; border: 1px solid #90caf9;
+        border-radius: 6px; padding: 10px; margin: 10px 0; color: #1565c0; font-size: 0.85rem;
+    }}
+    .rank-item {{
+        background: white; border: 1px solid #eee; border-radius: 6px;
+        padding: 8px 12px; margin: 4px 0; font-size: 0.9rem;
+    }}
+    .metrics-section {{
+        margin-top: 30px; padding-top: 20px;
+    }}
+    .opp-card {{
+        background: white; border-radius: 8px; padding: 12px;
+        border-left: 4px solid {PALETA['morado_primario']}; margin: 8px 0;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+    }}
+    .opp-item {{
+        display: flex; justify-content: space-between; align-items: center;
+        padding: 6px 0; border-bottom: 1px solid #f0f0f0;
+    }}
+    .opp-item:last-child {{border-bottom: none;}}
+</style>
+"""
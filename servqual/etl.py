@@ -0,0 +1,216 @@
+"""
+Enriquecimiento de respuestas crudas
+====================================
+Versión vectorizada de notebooks/01_data_wrangling.ipynb: recibe filas con el
+formato de teleton-non-excel.csv y produce las columnas de teleton_enriched.csv.
+Las clasificaciones (turno, NPS, satisfacción, calidad, antigüedad, info, nivel
+económico) se hacen con pd.cut / tablas de búsqueda en lugar de .apply por fila,
+y las búsquedas por estado se resuelven sobre las categorías, no sobre las filas.
+
+procesar() lee el CSV crudo por bloques y escribe cada bloque enriquecido, así la
+memoria queda acotada por el tamaño de bloque:
+
+    python -m servqual.etl                                  # data/teleton-non-excel.csv -> Parquet del almacén
+    python -m servqual.etl crudo.csv salida.csv --bloque 500000
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .almacen import ESQUEMA, RUTA_PARQUET, a_esquema
+from .variables import vars_servqual
+
+RUTA_CRUDO = Path(__file__).resolve().parent.parent / 'data' / 'teleton-non-excel.csv'
+FILAS_POR_BLOQUE = 250_000
+
+# Tipos de lectura del CSV crudo: texto repetido como categoría desde el parser
+TIPOS_CRUDO = {'timestamp': str, 'Giro': 'category', 'Puesto': 'category', 'Estado': 'category'}
+
+RENOMBRES = {'R_12': 'NPS', 'Info': 'INFO', 'Años': 'AÑOS'}
+
+dimensiones_servqual = {
+    'tangibles': ['AT_1', 'AT_2'],
+    'fiabilidad': ['FI_1', 'FI_2', 'FI_3'],
+    'responsiveness': ['R_1', 'R_2', 'R_3'],
+    'empatia': ['E_1', 'E_2', 'E_3', 'E_4']
+}
+
+regiones_mexico = {
+    'Aguascalientes': 'Centro-Norte', 'Baja California': 'Noroeste', 'Baja California Sur': 'Noroeste',
+    'Campeche': 'Sureste', 'Chiapas': 'Sureste', 'Chihuahua': 'Norte', 'Ciudad de México': 'Centro',
+    'Coahuila': 'Norte', 'Colima': 'Occidente', 'Durango': 'Norte', 'Estado de México': 'Centro',
+    'Guanajuato': 'Bajío', 'Guerrero': 'Sur', 'Hidalgo': 'Centro', 'Jalisco': 'Occidente',
+    'Michoacán': 'Occidente', 'Morelos': 'Centro', 'Nayarit': 'Occidente', 'Nuevo León': 'Noreste',
+    'Oaxaca': 'Sur', 'Puebla': 'Centro', 'Querétaro': 'Bajío', 'Quintana Roo': 'Sureste',
+    'San Luis Potosí': 'Centro-Norte', 'Sinaloa': 'Noroeste', 'Sonora': 'Noroeste', 'Tabasco': 'Sureste',
+    'Tamaulipas': 'Noreste', 'Tlaxcala': 'Centro', 'Veracruz': 'Golfo', 'Yucatán': 'Sureste',
+    'Zacatecas': 'Centro-Norte'
+}
+
+# Regiones agrupadas que usa el dashboard
+region_simplificada = {
+    'Bajío': 'Centro', 'Centro': 'Centro', 'Centro-Norte': 'Centro', 'Golfo': 'Sur',
+    'Noreste': 'Norte', 'Noroeste': 'Norte', 'Norte': 'Norte', 'Occidente': 'Occidente',
+    'Sur': 'Sur', 'Sureste': 'Sureste'
+}
+
+# Población (INEGI 2020, millones) y PIB per cápita (miles de pesos, 2020)
+poblacion_estados = {
+    'Aguascalientes': 1.43, 'Baja California': 3.77, 'Baja California Sur': 0.80, 'Campeche': 0.93,
+    'Chiapas': 5.54, 'Chihuahua': 3.74, 'Ciudad de México': 9.21, 'Coahuila': 3.15, 'Colima': 0.73,
+    'Durango': 1.83, 'Estado de México': 16.99, 'Guanajuato': 6.17, 'Guerrero': 3.54, 'Hidalgo': 3.08,
+    'Jalisco': 8.35, 'Michoacán': 4.75, 'Morelos': 1.97, 'Nayarit': 1.29, 'Nuevo León': 5.78,
+    'Oaxaca': 4.13, 'Puebla': 6.58, 'Querétaro': 2.37, 'Quintana Roo': 1.86, 'San Luis Potosí': 2.82,
+    'Sinaloa': 3.03, 'Sonora': 2.94, 'Tabasco': 2.40, 'Tamaulipas': 3.53, 'Tlaxcala': 1.34,
+    'Veracruz': 8.06, 'Yucatán': 2.32, 'Zacatecas': 1.62
+}
+
+pib_per_capita_estados = {
+    'Aguascalientes': 198, 'Baja California': 214, 'Baja California Sur': 247, 'Campeche': 442,
+    'Chiapas': 58, 'Chihuahua': 218, 'Ciudad de México': 394, 'Coahuila': 263, 'Colima': 173,
+    'Durango': 142, 'Estado de México': 114, 'Guanajuato': 157, 'Guerrero': 79, 'Hidalgo': 115,
+    'Jalisco': 183, 'Michoacán': 107, 'Morelos': 108, 'Nayarit': 109, 'Nuevo León': 310,
+    'Oaxaca': 73, 'Puebla': 113, 'Querétaro': 250, 'Quintana Roo': 211, 'San Luis Potosí': 161,
+    'Sinaloa': 151, 'Sonora': 219, 'Tabasco': 180, 'Tamaulipas': 182, 'Tlaxcala': 80,
+    'Veracruz': 118, 'Yucatán': 149, 'Zacatecas': 118
+}
+
+# Centroides de estados (lat, long)
+coordenadas_estados = {
+    'Aguascalientes': (21.8853, -102.2916), 'Baja California': (30.8406, -115.2838),
+    'Baja California Sur': (26.0444, -111.6661), 'Campeche': (19.8301, -90.5349),
+    'Chiapas': (16.7569, -93.1292), 'Chihuahua': (28.6330, -106.0691),
+    'Ciudad de México': (19.4326, -99.1332), 'Coahuila': (27.0587, -101.7068),
+    'Colima': (19.2452, -103.7241), 'Durango': (24.0277, -104.6532),
+    'Estado de México': (19.4969, -99.7233), 'Guanajuato': (21.0190, -101.2574),
+    'Guerrero': (17.4392, -99.5451), 'Hidalgo': (20.0911, -98.7624),
+    'Jalisco': (20.6595, -103.3494), 'Michoacán': (19.5665, -101.7068),
+    'Morelos': (18.6813, -99.1013), 'Nayarit': (21.7514, -104.8455),
+    'Nuevo León': (25.5922, -99.9962), 'Oaxaca': (17.0732, -96.7266),
+    'Puebla': (19.0414, -98.2063), 'Querétaro': (20.5888, -100.3899),
+    'Quintana Roo': (19.1817, -88.4791), 'San Luis Potosí': (22.1565, -100.9855),
+    'Sinaloa': (24.8091, -107.3940), 'Sonora': (29.2972, -110.3309),
+    'Tabasco': (17.8409, -92.6189), 'Tamaulipas': (24.2669, -98.8363),
+    'Tlaxcala': (19.3139, -98.2404), 'Veracruz': (19.1738, -96.1342),
+    'Yucatán': (20.7099, -89.0943), 'Zacatecas': (22.7709, -102.5832)
+}
+
+giro_corto = {'Asociación civil': 'Asoc. Civil'}
+
+# Turno por hora (0-23): Mañana 6-11, Tarde 12-17, Noche el resto
+_TURNO_POR_HORA = np.array(['Noche'] * 6 + ['Mañana'] * 6 + ['Tarde'] * 6 + ['Noche'] * 6, dtype=object)
+
+_INF = np.inf
+
+
+def _clasificar(serie, limites, etiquetas, right=True):
+    """Clasificación por intervalos (equivale a las cadenas if/elif del notebook)"""
+    return pd.cut(serie.astype('float64'), [-_INF, *limites, _INF], labels=etiquetas, right=right)
+
+
+def _media_filas(valores):
+    """Media por fila ignorando nulos (NaN si la fila no tiene valores), como DataFrame.mean(axis=1)"""
+    validos = ~np.isnan(valores)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(validos, valores, 0.0).sum(axis=1) / validos.sum(axis=1)
+
+
+def enriquecer(raw):
+    """Columnas enriquecidas (orden de teleton_enriched.csv) a partir de filas crudas"""
+    df = raw.rename(columns=RENOMBRES)
+    out = pd.DataFrame(index=df.index)
+
+    # Temporales
+    ts = pd.to_datetime(df['timestamp'], format='%m/%d/%Y %H:%M:%S')
+    out['timestamp'] = ts
+    out['fecha'] = ts.dt.normalize()
+    out['mes'] = ts.dt.month.astype('int8')
+    out['dia_semana'] = ts.dt.day_name().astype('category')
+    out['dia_semana_num'] = ts.dt.dayofweek.astype('int8')
+    out['hora'] = ts.dt.hour.astype('int8')
+    out['turno'] = pd.Categorical(_TURNO_POR_HORA[out['hora'].to_numpy()])
+
+    # Ítems y scores SERVQUAL
+    for col in vars_servqual:
+        out[col] = pd.to_numeric(df[col], errors='coerce').astype('Int8')
+    items = out[vars_servqual].to_numpy(dtype='float64', na_value=np.nan)
+    scores = np.column_stack([_media_filas(items[:, [vars_servqual.index(c) for c in cols]])
+                              for cols in dimensiones_servqual.values()]).round(2)
+    for i, dimension in enumerate(dimensiones_servqual):
+        out[f'score_{dimension}'] = scores[:, i]
+    out['score_servqual_total'] = _media_filas(scores).round(2)
+
+    # Outcomes con su categoría
+    for col in ['D_1', 'NPS', 'C_1', 'INFO']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int8')
+    out['D_1'] = df['D_1']
+    out['satisfaccion_nivel'] = _clasificar(df['D_1'], [4, 7], ['Bajo', 'Medio', 'Alto'])
+    out['NPS'] = df['NPS']
+    out['nps_categoria'] = _clasificar(df['NPS'], [6, 8], ['Detractor', 'Pasivo', 'Promotor'])
+    out['C_1'] = df['C_1']
+    out['calidad_nivel'] = _clasificar(df['C_1'], [2, 3], ['Deficiente', 'Regular', 'Bueno'])
+    out['INFO'] = df['INFO']
+    out['info_nivel'] = _clasificar(df['INFO'], [4, 7], ['Desinformado', 'Parcialmente informado', 'Bien informado'])
+
+    # Demográficas
+    out['AÑOS'] = pd.to_numeric(df['AÑOS'], errors='coerce').astype('Int16')
+    out['antiguedad_grupo'] = _clasificar(out['AÑOS'], [2, 5], ['Nuevo', 'Establecido', 'Veterano'])
+    out['Giro'] = giro = df['Giro'].astype('category')
+    out['Puesto'] = df['Puesto'].astype('category')
+
+    # Geográficas: "Ciudad de México, Morelos" -> "Ciudad de México" (sobre categorías)
+    out['Estado'] = df['Estado'].astype('category')
+    limpio = out['Estado'].map({e: e.split(',')[0].strip() if ',' in e else e
+                                for e in out['Estado'].cat.categories}).astype('category')
+    out['Estado_limpio'] = limpio
+    out['region'] = limpio.map(regiones_mexico).astype('category')
+    out['poblacion_millones'] = limpio.map(poblacion_estados).astype('float64')
+    out['pib_per_capita_miles'] = limpio.map(pib_per_capita_estados).astype('float64')
+    out['nivel_economico_estado'] = _clasificar(out['pib_per_capita_miles'], [120, 200], ['Bajo', 'Medio', 'Alto'], right=False)
+    out['lat'] = limpio.map({e: c[0] for e, c in coordenadas_estados.items()}).astype('float64')
+    out['long'] = limpio.map({e: c[1] for e, c in coordenadas_estados.items()}).astype('float64')
+    out['region_simplificada'] = out['region'].map(region_simplificada).astype('category')
+    out['Giro_corto'] = giro.cat.rename_categories(lambda g: giro_corto.get(g, g))
+    return out
+
+
+def leer_crudo(ruta=RUTA_CRUDO, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Iterador de bloques del CSV crudo"""
+    return pd.read_csv(ruta, encoding='utf-8-sig', dtype=TIPOS_CRUDO, chunksize=filas_por_bloque)
+
+
+def procesar(ruta_crudo=RUTA_CRUDO, ruta_salida=None, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Enriquece el CSV crudo bloque a bloque hacia Parquet (esquema del almacén) o CSV; devuelve filas escritas"""
+    ruta_salida = Path(ruta_salida or RUTA_PARQUET)
+    tmp = Path(f"{ruta_salida}.{os.getpid()}.tmp")
+    como_parquet = ruta_salida.suffix == '.parquet'
+    escritor, filas = None, 0
+    try:
+        for i, bloque in enumerate(leer_crudo(ruta_crudo, filas_por_bloque)):
+            out = enriquecer(bloque)
+            if como_parquet:
+                escritor = escritor or pq.ParquetWriter(tmp, ESQUEMA, compression='zstd')
+                escritor.write_table(a_esquema(pa.Table.from_pandas(out, preserve_index=False)))
+            else:
+                out.to_csv(tmp, mode='w' if i == 0 else 'a', header=i == 0, index=False, encoding='utf-8-sig' if i == 0 else 'utf-8')
+            filas += len(out)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    os.replace(tmp, ruta_salida)
+    return filas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Enriquece el CSV crudo de respuestas SERVQUAL')
+    parser.add_argument('crudo', nargs='?', default=RUTA_CRUDO)
+    parser.add_argument('salida', nargs='?', default=None, help='.parquet (por defecto, el almacén) o .csv')
+    parser.add_argument('--bloque', type=int, default=FILAS_POR_BLOQUE, help='filas por bloque')
+    args = parser.parse_args()
+    print(f"{procesar(args.crudo, args.salida, args.bloque):,} filas enriquecidas")
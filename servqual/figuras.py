@@ -0,0 +1,219 @@
+"""
+Figuras Plotly del dashboard
+============================
+Mapas por estado, radar y distribución NPS, barras por segmento, áreas de
+oportunidad e impulsores del NPS a partir de los agregados (servqual.acumulados).
+Solo construyen figuras: el dashboard las muestra con st.plotly_chart y
+servqual.reportes las escribe en HTML estático.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from . import geo
+from .estilo import ESCALA_NPS, ESCALA_VOLUMEN, PALETA
+
+# Colores por dimensión SERVQUAL (barras de oportunidad y su leyenda)
+COLORES_DIMENSION = {'Tangibles': PALETA['turquesa'], 'Fiabilidad': PALETA['morado_primario'],
+                     'Responsiveness': PALETA['naranja'], 'Empatía': PALETA['amarillo']}
+
+
+# =============================================================================
+# MAPAS
+# =============================================================================
+def mapa_choropleth(data, col, escala, custom_hover=True):
+    """Mapa choropleth con fondo geográfico visible y hover completo"""
+    mexico_geojson = geo.cargar_geojson()
+    if mexico_geojson:
+        # Preparar hover_data con todas las métricas
+        if custom_hover:
+            hover_template = (
+                "<b>%{customdata[0]}</b><br>" +
+                "NPS: %{customdata[1]:.0f}<br>" +
+                "Satisfacción: %{customdata[2]:.1f}<br>" +
+                "Calidad: %{customdata[3]:.1f}<br>" +
+                "SERVQUAL: %{customdata[4]:.2f}<br>" +
+                "Respuestas: %{customdata[5]}<extra></extra>"
+            )
+            customdata = np.column_stack([
+                data['Estado_limpio'],
+                data['NPS_Score'],
+                data['D_1'],
+                data['C_1'],
+                data['score_servqual_total'],
+                data['n']
+            ])
+        else:
+            hover_template = None
+            customdata = None
+
+        fig = px.choropleth_mapbox(
+            data,
+            geojson=mexico_geojson,
+            locations='estado_geojson',
+            featureidkey='properties.name',
+            color=col,
+            color_continuous_scale=escala,
+            mapbox_style="carto-positron",
+            center={"lat": 23.6345, "lon": -102.5528},
+            zoom=4,
+            opacity=0.7
+        )
+        if custom_hover:
+            fig.update_traces(customdata=customdata, hovertemplate=hover_template)
+        fig.update_layout(
+            height=420,
+            margin=dict(l=0, r=0, t=10, b=0),
+            coloraxis_showscale=False,
+            paper_bgcolor='white'
+        )
+    else:
+        # Fallback sin GeoJSON
+        fig = go.Figure(go.Scattergeo(
+            lat=data['lat'], lon=data['long'], mode='markers',
+            marker=dict(size=15, color=data[col], colorscale=escala, showscale=False),
+            text=data['Estado_limpio'], hoverinfo='text'
+        ))
+        fig.update_geos(scope='north america', center=dict(lat=23.6, lon=-102.5), projection_scale=4)
+        fig.update_layout(height=420, margin=dict(l=0,r=0,t=10,b=0))
+    return fig
+
+
+def mapa_volumen(data):
+    """Mapa de volumen de respuestas (verde)"""
+    mexico_geojson = geo.cargar_geojson()
+    if mexico_geojson:
+        hover_template = (
+            "<b>%{customdata[0]}</b><br>" +
+            "Respuestas: %{customdata[1]}<br>" +
+            "NPS: %{customdata[2]:.0f}<br>" +
+            "Confianza: %{customdata[3]:.0%}<extra></extra>"
+        )
+        customdata = np.column_stack([
+            data['Estado_limpio'],
+            data['n'],
+            data['NPS_Score'],
+            data['confianza']
+        ])
+        fig = px.choropleth_mapbox(
+            data,
+            geojson=mexico_geojson,
+            locations='estado_geojson',
+            featureidkey='properties.name',
+            color='n',
+            color_continuous_scale=ESCALA_VOLUMEN,
+            mapbox_style="carto-positron",
+            center={"lat": 23.6345, "lon": -102.5528},
+            zoom=4,
+            opacity=0.7
+        )
+        fig.update_traces(customdata=customdata, hovertemplate=hover_template)
+        fig.update_layout(
+            height=420,
+            margin=dict(l=0, r=0, t=10, b=0),
+            coloraxis_colorbar=dict(title="n"),
+            paper_bgcolor='white'
+        )
+    else:
+        fig = go.Figure()
+    return fig
+
+
+# =============================================================================
+# PERFIL
+# =============================================================================
+def radar(valores):
+    """Radar de las cuatro dimensiones contra el objetivo de 4.0"""
+    cats = ['Tangibles', 'Fiabilidad', 'Responsiveness', 'Empatía']
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(r=valores+[valores[0]], theta=cats+[cats[0]], fill='toself',
+                                  fillcolor='rgba(90,0,119,0.2)', line=dict(color=PALETA['morado_primario'], width=3), name='Actual'))
+    fig.add_trace(go.Scatterpolar(r=[4,4,4,4,4], theta=cats+[cats[0]],
+                                  line=dict(color=PALETA['amarillo'], width=4, dash='dash'), name='Objetivo (4.0)'))
+    fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[2.5, 5])),
+                      showlegend=True, height=350, paper_bgcolor='white')
+    return fig
+
+
+def dona_nps(kpis):
+    """Dona de detractores, pasivos y promotores con el NPS al centro"""
+    n_prom, n_pas, n_det = kpis['n_promotores'], kpis['n_pasivos'], kpis['n_detractores']
+    fig = go.Figure(go.Pie(values=[n_det, n_pas, n_prom], labels=['Detractores', 'Pasivos', 'Promotores'],
+                           hole=0.6, marker_colors=[ESCALA_NPS[-1], ESCALA_NPS[2], ESCALA_NPS[0]],
+                           textinfo='percent', sort=False))
+    fig.update_layout(height=200, margin=dict(t=10,b=10),
+                      annotations=[dict(text=f'NPS<br><b>{kpis["nps"]:.0f}</b>', x=0.5, y=0.5, font_size=16, showarrow=False)],
+                      paper_bgcolor='white', showlegend=False)
+    return fig
+
+
+def barras_nps(kpis):
+    """Porcentaje y conteo por categoría NPS"""
+    n_prom, n_pas, n_det = kpis['n_promotores'], kpis['n_pasivos'], kpis['n_detractores']
+    total = n_prom + n_pas + n_det
+    nps_df = pd.DataFrame({'Cat': ['Detractores (1-6)', 'Pasivos (7-8)', 'Promotores (9-10)'],
+                           'N': [n_det, n_pas, n_prom],
+                           'Pct': [n_det/total*100 if total>0 else 0, n_pas/total*100 if total>0 else 0, n_prom/total*100 if total>0 else 0]})
+    fig = go.Figure(go.Bar(y=nps_df['Cat'], x=nps_df['Pct'], orientation='h',
+                           marker_color=[ESCALA_NPS[-1], ESCALA_NPS[2], ESCALA_NPS[0]],
+                           text=[f"{p:.0f}% (n={n})" for p,n in zip(nps_df['Pct'], nps_df['N'])], textposition='outside'))
+    fig.update_layout(height=140, xaxis_range=[0,100], plot_bgcolor='white', paper_bgcolor='white', margin=dict(t=5,b=20))
+    return fig
+
+
+# =============================================================================
+# SEGMENTOS, OPORTUNIDADES E IMPULSORES
+# =============================================================================
+def barras_segmento(segmento, col, rango, horizontal=True):
+    """(figura, media global) de las medias por grupo; en morado los grupos sobre la media"""
+    medias_grupo, medias_globales = segmento
+    stats = medias_grupo[col].sort_values(ascending=horizontal)
+    media = medias_globales[col]
+    colores = [PALETA['morado_primario'] if v >= media else PALETA['gris_apagado'] for v in stats.values]
+    if horizontal:
+        fig = go.Figure(go.Bar(y=stats.index, x=stats.values, orientation='h', marker_color=colores,
+                               text=[f"{v:.1f}" for v in stats.values], textposition='outside'))
+        fig.add_vline(x=media, line_dash="dash", line_color=PALETA['amarillo'], line_width=4)
+        fig.update_layout(xaxis_range=rango)
+    else:
+        fig = go.Figure(go.Bar(x=stats.index, y=stats.values, marker_color=colores,
+                               text=[f"{v:.1f}" for v in stats.values], textposition='outside'))
+        fig.add_hline(y=media, line_dash="dash", line_color=PALETA['amarillo'], line_width=4)
+        fig.update_layout(yaxis_range=rango)
+    fig.update_layout(height=260, plot_bgcolor='white', paper_bgcolor='white', margin=dict(t=10,b=30))
+    return fig, media
+
+
+def barras_oportunidad(top, media):
+    """Ítems con menor puntuación, coloreados por dimensión, contra la media SERVQUAL"""
+    fig = go.Figure(go.Bar(
+        y=top['nombre'], x=top['mean'], orientation='h',
+        marker_color=[COLORES_DIMENSION.get(d, PALETA['gris_medio']) for d in top['dimension']],
+        text=[f"{v:.2f}" for v in top['mean']], textposition='outside'
+    ))
+    fig.add_vline(x=media, line_dash="dash",
+                  line_color=PALETA['gris_medio'], line_width=2,
+                  annotation_text=f"Media: {media:.2f}")
+    fig.update_layout(
+        height=200,
+        xaxis_range=[3, 5],
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin=dict(t=10, b=30, l=10, r=10),
+        xaxis_title='Puntuación (1-5)'
+    )
+    return fig
+
+
+def barras_coeficientes(mod, variables, etiquetas):
+    """Coeficientes OLS del NPS; en morado los significativos (p < 0.05)"""
+    coefs = pd.Series({etiquetas[v]: mod['params'][v] for v in variables}).sort_values()
+    pvals = {etiquetas[v]: mod['pvalues'][v] for v in variables}
+    fig = go.Figure(go.Bar(y=coefs.index, x=coefs.values, orientation='h',
+                           marker_color=[PALETA['morado_primario'] if pvals[i] < 0.05 else PALETA['gris_apagado'] for i in coefs.index],
+                           text=[f"{v:.2f}" for v in coefs.values], textposition='outside'))
+    fig.add_vline(x=0, line_color='black')
+    fig.update_layout(height=120 + 22 * len(variables), plot_bgcolor='white', paper_bgcolor='white', margin=dict(t=10, b=30))
+    return fig
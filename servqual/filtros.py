@@ -0,0 +1,105 @@
+"""
+Índice de filtros del sidebar
+=============================
+Para cada dimensión de filtro se guarda, una sola vez, el arreglo ordenado de
+posiciones de fila de cada valor. Resolver una combinación de filtros es
+intersectar esos arreglos (del más corto al más largo); no se recorre ni se
+copia el DataFrame completo.
+
+Cada dimensión acepta un valor o una lista de valores (unión dentro de la
+dimensión, intersección entre dimensiones); 'Todos', None o una lista vacía no
+filtran. Los conteos por opción del sidebar (facetas) salen de las celdas de
+acumulados, no de filas.
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONES_FILTRO = ['Giro_display', 'Estado_limpio', 'region_simplificada', 'antiguedad_grupo']
+TODOS = 'Todos'
+
+
+def _interseccion(a, b):
+    """Intersección de dos arreglos ordenados sin duplicados (búsqueda binaria del corto en el largo)"""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return a
+    idx = np.searchsorted(b, a).clip(max=len(b) - 1)
+    return a[b[idx] == a]
+
+
+def valores_activos(valor):
+    """Valores que filtra una dimensión (tupla), o None si no filtra"""
+    if valor is None or isinstance(valor, str) and valor == TODOS:
+        return None
+    return (valor,) if isinstance(valor, str) else tuple(valor) or None
+
+
+def _mascara(tabla, seleccion, excluir=None):
+    mascara = np.ones(len(tabla), dtype=bool)
+    for col, valor in (seleccion or {}).items():
+        valores = valores_activos(valor)
+        if valores is not None and col != excluir:
+            mascara &= tabla[col].isin(valores).to_numpy()
+    return mascara
+
+
+def seleccionar_celdas(tabla, seleccion):
+    """Filas de una tabla agregada (celdas, conteos) que cumplen {columna: valor(es)}; 'Todos', None o [] no filtran"""
+    return tabla[_mascara(tabla, seleccion)]
+
+
+def facetas(tabla, seleccion, dimensiones=DIMENSIONES_FILTRO):
+    """{dimensión: Series respuestas por valor} con los filtros de las demás dimensiones (filtrado cruzado)"""
+    return {col: tabla.loc[_mascara(tabla, seleccion, excluir=col)].groupby(col)['n'].sum().astype('int64')
+            for col in dimensiones}
+
+
+class IndiceFiltros:
+    """Posiciones de fila por valor para cada dimensión de filtro"""
+
+    def __init__(self, df, dimensiones=DIMENSIONES_FILTRO):
+        self.n = len(df)
+        self.posiciones = {}
+        for col in dimensiones:
+            codigos, categorias = self._codificar(df[col])
+            orden = np.argsort(codigos, kind='stable').astype(np.int32)
+            limites = np.searchsorted(codigos[orden], np.arange(len(categorias) + 1))
+            self.posiciones[col] = {cat: orden[limites[i]:limites[i + 1]]
+                                    for i, cat in enumerate(categorias) if limites[i + 1] > limites[i]}
+
+    @staticmethod
+    def _codificar(serie):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            return serie.cat.codes.to_numpy(), list(serie.cat.categories)
+        codigos, categorias = pd.factorize(serie)
+        return codigos, list(categorias)
+
+    def valores(self, col):
+        """Valores presentes de una dimensión, ordenados"""
+        return sorted(self.posiciones[col])
+
+    def _posiciones(self, col, valores):
+        """Posiciones ordenadas de cualquiera de los valores de una dimensión"""
+        vacio = np.empty(0, dtype=np.int32)
+        if len(valores) == 1:
+            return self.posiciones[col].get(valores[0], vacio)
+        return np.sort(np.concatenate([self.posiciones[col].get(v, vacio) for v in valores]))
+
+    def resolver(self, seleccion):
+        """Posiciones que cumplen {columna: valor(es)}; None si ningún filtro está activo"""
+        activos = [self._posiciones(col, valores) for col, valores in
+                   ((col, valores_activos(valor)) for col, valor in seleccion.items()) if valores is not None]
+        if not activos:
+            return None
+        activos.sort(key=len)
+        pos = activos[0]
+        for otro in activos[1:]:
+            pos = _interseccion(pos, otro)
+        return pos
+
+    def filtrar(self, df, seleccion):
+        """Subconjunto de df: el mismo objeto sin filtros, o solo las filas seleccionadas"""
+        pos = self.resolver(seleccion)
+        return df if pos is None else df.take(pos)
@@ -0,0 +1,38 @@
+"""
+Geometría de estados de México
+==============================
+GeoJSON local (32 entidades, simplificado) para los mapas choropleth; no requiere red.
+Fuente: shapefile `mexicojoin` de los ejemplos de PySAL (BSD-3), nombres
+homologados a los valores de ESTADO_GEOJSON_MAP.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+RUTA_GEOJSON = Path(__file__).resolve().parent.parent / 'data' / 'mexico_estados.geojson'
+
+ESTADO_GEOJSON_MAP = {
+    'Aguascalientes': 'Aguascalientes', 'Baja California': 'Baja California',
+    'Baja California Sur': 'Baja California Sur', 'Campeche': 'Campeche',
+    'Chiapas': 'Chiapas', 'Chihuahua': 'Chihuahua', 'Ciudad de México': 'Distrito Federal',
+    'Coahuila': 'Coahuila de Zaragoza', 'Colima': 'Colima', 'Durango': 'Durango',
+    'Estado de México': 'México', 'Guanajuato': 'Guanajuato', 'Guerrero': 'Guerrero',
+    'Hidalgo': 'Hidalgo', 'Jalisco': 'Jalisco', 'Michoacán': 'Michoacán de Ocampo',
+    'Morelos': 'Morelos', 'Nayarit': 'Nayarit', 'Nuevo León': 'Nuevo León',
+    'Oaxaca': 'Oaxaca', 'Puebla': 'Puebla', 'Querétaro': 'Querétaro',
+    'Quintana Roo': 'Quintana Roo', 'San Luis Potosí': 'San Luis Potosí',
+    'Sinaloa': 'Sinaloa', 'Sonora': 'Sonora', 'Tabasco': 'Tabasco',
+    'Tamaulipas': 'Tamaulipas', 'Tlaxcala': 'Tlaxcala', 'Veracruz': 'Veracruz de Ignacio de la Llave',
+    'Yucatán': 'Yucatán', 'Zacatecas': 'Zacatecas'
+}
+
+
+@lru_cache(maxsize=None)
+def cargar_geojson(ruta=RUTA_GEOJSON):
+    """GeoJSON parseado una vez por proceso (None si el archivo no existe)"""
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:
+        return None
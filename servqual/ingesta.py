@@ -0,0 +1,40 @@
+"""
+Ingesta incremental
+===================
+Agrega respuestas nuevas (formato de teleton-non-excel.csv) sin regenerar el
+CSV enriquecido: se enriquecen, se guardan como incremento del almacén y se
+suman a las estadísticas suficientes por segmento.
+
+    python -m servqual.ingesta nuevas_respuestas.csv
+"""
+
+import sys
+
+import pandas as pd
+
+from . import almacen
+from .acumulados import Acumulados, leer_acumulados
+from .etl import enriquecer
+
+
+def ingerir(raw):
+    """Ingiere un DataFrame crudo o la ruta de un CSV crudo; devuelve los acumulados actualizados"""
+    if not isinstance(raw, pd.DataFrame):
+        raw = pd.read_csv(raw, encoding='utf-8-sig')
+    acum = leer_acumulados(almacen.version_dataset())
+    nuevos = almacen.preparar(enriquecer(raw))
+    almacen.agregar_filas(nuevos)
+    version = almacen.version_dataset()
+    if acum is None:
+        # Sin acumulados vigentes: se reconstruyen una vez desde el almacén completo
+        acum = Acumulados.desde_frame(almacen.preparar(almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD)), version=version)
+    else:
+        acum.agregar(nuevos, version)
+    acum.guardar()
+    return acum
+
+
+if __name__ == '__main__':
+    for ruta in sys.argv[1:]:
+        acum = ingerir(ruta)
+        print(f"{ruta}: {int(acum.celdas['n'].sum()):,} respuestas acumuladas (versión {acum.version})")
@@ -0,0 +1,119 @@
+"""
+Métricas SERVQUAL sin Streamlit
+===============================
+API para procesos batch, workers y benchmarks. Acepta un DataFrame o una tabla
+Arrow del almacén y devuelve los mismos resultados que muestra el dashboard.
+
+    from servqual import metricas
+    res = metricas.vision_operativa(tabla, Estado_limpio='Jalisco')
+    est = metricas.analisis_estadistico(tabla)
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .almacen import preparar
+
+OBJETIVO_ITEM = 4.0  # Meta por ítem en escala 1-5
+
+
+def como_frame(datos):
+    """DataFrame listo para las métricas a partir de un DataFrame o una tabla Arrow"""
+    if isinstance(datos, pa.Table):
+        datos = datos.to_pandas(date_as_object=False)
+    return preparar(datos)
+
+
+def nps_desde_conteos(promotores, detractores, total):
+    """NPS = %Promotores - %Detractores (escalares o arreglos; 0 si no hay respuestas)"""
+    total = np.where(np.asarray(total) > 0, total, np.nan)
+    nps = np.nan_to_num(np.asarray(promotores) / total * 100 - np.asarray(detractores) / total * 100)
+    return nps if nps.ndim else float(nps)
+
+
+def nps_score(categorias):
+    """NPS de una serie de nps_categoria (Detractor/Pasivo/Promotor)"""
+    pct = categorias.value_counts(normalize=True) * 100
+    return pct.get('Promotor', 0) - pct.get('Detractor', 0)
+
+
+def porcentaje_normalizado(media, escala_max):
+    """Media de una escala 1-N expresada como porcentaje del máximo (0-100%)"""
+    return (media / escala_max) * 100
+
+
+def confianza(n):
+    """Factor de confianza por tamaño de muestra: 1 - 1/sqrt(n)"""
+    return 1 - 1 / np.sqrt(np.clip(n, 1, None))
+
+
+def nps_ponderado(nps, n):
+    """NPS normalizado por volumen: NPS × (1 - 1/√n)"""
+    return nps * confianza(n)
+
+
+def calc_stats(series):
+    """Media, mediana, desviación estándar e IQR de una serie sin nulos"""
+    return {
+        'Media': series.mean(),
+        'Mediana': series.median(),
+        'Desv.Est.': series.std(),
+        'IQR': f"{series.quantile(0.25):.1f}-{series.quantile(0.75):.1f}"
+    }
+
+
+def semaforo_item(media):
+    """🔴 bajo 3.8, 🟡 bajo la meta de 4.0, 🟢 en meta"""
+    return "🔴" if media < 3.8 else "🟡" if media < OBJETIVO_ITEM else "🟢"
+
+
+def brechas_items(item_stats, objetivo=OBJETIVO_ITEM):
+    """Brecha de cada ítem contra la meta (positiva = por debajo), del peor al mejor"""
+    res = item_stats.sort_values('mean').copy()
+    res['gap'] = objetivo - res['mean']
+    res['semaforo'] = [semaforo_item(m) for m in res['mean']]
+    return res
+
+
+def formato_ic(inferior, superior, plantilla="[{:.0f}, {:.0f}]"):
+    """Intervalo bootstrap del NPS como texto por grupo; '—' en grupos sin respuestas (NaN)"""
+    return [plantilla.format(a, b) if np.isfinite(a) and np.isfinite(b) else "—" for a, b in zip(inferior, superior)]
+
+
+def tablas_resumen(resumen):
+    """(outcomes, dimensiones SERVQUAL + total) del "Resumen de Métricas" como tablas de texto"""
+    outcome_data = []
+    for var, nombre, escala in [('D_1', 'Satisfacción', '1-10'), ('NPS', 'Recomendación', '1-10'),
+                                 ('C_1', 'Calidad', '1-5'), ('INFO', 'Información', '1-10')]:
+        stats = resumen[var]
+        outcome_data.append({'Métrica': nombre, 'Media': f"{stats['Media']:.2f}", 'Mediana': f"{stats['Mediana']:.1f}",
+                             'Desv.Est.': f"{stats['Desv.Est.']:.2f}", 'IQR (Q1-Q3)': stats['IQR'], 'Escala': escala})
+    serv_data = []
+    for var, nombre in [('score_tangibles', 'Tangibles'), ('score_fiabilidad', 'Fiabilidad'),
+                        ('score_responsiveness', 'Responsiveness'), ('score_empatia', 'Empatía'),
+                        ('score_servqual_total', 'TOTAL')]:
+        stats = resumen[var]
+        serv_data.append({'Dimensión': nombre, 'Media': f"{stats['Media']:.2f}", 'Mediana': f"{stats['Mediana']:.2f}",
+                          'Desv.Est.': f"{stats['Desv.Est.']:.2f}", 'IQR (Q1-Q3)': stats['IQR']})
+    return pd.DataFrame(outcome_data), pd.DataFrame(serv_data)
+
+
+def vision_operativa(datos, **filtros):
+    """Agregados de la pestaña 1 (KPIs, resúmenes, estados, segmentos, ítems, regresión) para {columna: valor(es)}
+
+    Misma ruta que el dashboard (Acumulados.agregados); un filtro fuera de DIMENSIONES_FILTRO se agrega a las claves.
+    """
+    from .acumulados import Acumulados
+    from .filtros import DIMENSIONES_FILTRO
+    claves = [*DIMENSIONES_FILTRO, *(c for c in filtros if c not in DIMENSIONES_FILTRO)]
+    res = Acumulados.desde_frame(como_frame(datos), claves).agregados(filtros)
+    res['brechas'] = brechas_items(res['item_stats'])
+    return res
+
+
+def analisis_estadistico(datos):
+    """Resultados de la pestaña 2 (correlaciones, chi², t, ANOVA, OLS) sobre el dataset completo"""
+    from .estadistica import calcular_estadistica
+    return calcular_estadistica(como_frame(datos))
+
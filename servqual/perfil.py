@@ -0,0 +1,158 @@
+"""
+Modo perfil
+===========
+Tiempo y memoria asignada por sección con nombre. Se activa con la variable de
+entorno SERVQUAL_PERFIL=1 para todas las ejecuciones; con SERVQUAL_PERFIL=consulta
+solo las que piden ?perfil=1 en el dashboard (sin la variable, el parámetro se
+ignora: un visitante cualquiera no puede encenderlo). Inactivo, `medir` no hace nada. Cada medición se registra como una línea JSON en el logger
+'servqual.perfil' (stderr, o el archivo de SERVQUAL_PERFIL_LOG).
+
+    perfil.activar(perfil.Perfilador())
+    with perfil.medir('estado_stats'):
+        ...
+
+El perfilador activo vive en una ContextVar: cada sesión de Streamlit corre en su
+propio hilo, así que las mediciones no se mezclan entre sesiones. La memoria sí
+es del proceso (tracemalloc): con varias sesiones simultáneas es aproximada, y una
+vez iniciado tracemalloc hace más lento todo el proceso (es una herramienta de
+diagnóstico, no para dejarla encendida): se detiene al cerrar el último
+perfilador que la usa.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+
+_MODO = os.environ.get('SERVQUAL_PERFIL', '').lower()
+ACTIVO = _MODO not in ('', '0', 'consulta')
+CONSULTA = _MODO == 'consulta'  # ?perfil=1 permitido
+RUTA_LOG = os.environ.get('SERVQUAL_PERFIL_LOG')
+
+registro = logging.getLogger('servqual.perfil')
+_actual = ContextVar('perfilador', default=None)
+
+# Perfiladores con memoria abiertos: tracemalloc corre mientras haya alguno
+# (si ya estaba encendida desde fuera, p. ej. python -X tracemalloc, no se detiene)
+_trazando = 0
+_propias = False
+_lock_trazas = threading.Lock()
+
+
+def _iniciar_trazas():
+    global _trazando, _propias
+    with _lock_trazas:
+        if _trazando == 0:
+            _propias = not tracemalloc.is_tracing()
+            if _propias:
+                tracemalloc.start()
+        _trazando += 1
+
+
+def _detener_trazas():
+    global _trazando
+    with _lock_trazas:
+        _trazando -= 1
+        if _trazando == 0 and _propias:
+            tracemalloc.stop()
+
+
+def _configurar_log():
+    if registro.handlers:
+        return
+    manejador = logging.FileHandler(RUTA_LOG, encoding='utf-8') if RUTA_LOG else logging.StreamHandler()
+    manejador.setFormatter(logging.Formatter('%(message)s'))
+    registro.addHandler(manejador)
+    registro.setLevel(logging.INFO)
+    registro.propagate = False
+
+
+class Perfilador:
+    """Mediciones de una ejecución: [{seccion, nivel, inicio_ms, ms, neto_kb, pico_kb}] en orden de cierre"""
+
+    def __init__(self, memoria=True):
+        self.id = uuid.uuid4().hex[:8]
+        self.inicio = time.perf_counter()
+        self.memoria = memoria
+        self.mediciones = []
+        self._picos = []  # Pico acumulado de cada medición abierta (las anidadas lo propagan)
+        self.cerrado = False
+        if memoria:
+            _iniciar_trazas()
+        _configurar_log()
+
+    def cerrar(self):
+        """Fin de la ejecución: libera tracemalloc si ningún otro perfilador lo usa"""
+        if self.memoria and not self.cerrado:
+            _detener_trazas()
+        self.cerrado = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _reiniciar_pico(self):
+        """Memoria actual; el pico desde el último reinicio se acumula en la medición abierta"""
+        actual, pico = tracemalloc.get_traced_memory()
+        if self._picos:
+            self._picos[-1] = max(self._picos[-1], pico)
+        tracemalloc.reset_peak()
+        return actual
+
+    @contextmanager
+    def medir(self, nombre):
+        inicial = self._reiniciar_pico() if self.memoria else 0
+        self._picos.append(inicial)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            neto = pico = 0
+            if self.memoria:
+                actual = self._reiniciar_pico()
+                pico = self._picos.pop()
+                if self._picos:
+                    self._picos[-1] = max(self._picos[-1], pico)
+                neto, pico = actual - inicial, pico - inicial
+            else:
+                self._picos.pop()
+            medicion = {'seccion': nombre, 'nivel': len(self._picos),
+                        'inicio_ms': round((inicio - self.inicio) * 1000, 2), 'ms': round(ms, 2),
+                        'neto_kb': round(neto / 1024, 1), 'pico_kb': round(pico / 1024, 1)}
+            self.mediciones.append(medicion)
+            registro.info(json.dumps({'evento': 'perfil', 'ejecucion': self.id, **medicion}, ensure_ascii=False))
+
+    def total_ms(self):
+        return (time.perf_counter() - self.inicio) * 1000
+
+
+def activar(perfilador):
+    """Perfilador de la ejecución actual (None lo desactiva)"""
+    _actual.set(perfilador)
+    return perfilador
+
+
+def medir(nombre):
+    """Contexto que mide `nombre` con el perfilador activo; no hace nada si no hay uno"""
+    perfilador = _actual.get()
+    return nullcontext() if perfilador is None else perfilador.medir(nombre)
+
+
+def medido(nombre=None):
+    """Decorador: mide cada llamada de la función con el perfilador activo"""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(nombre or funcion.__name__):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
@@ -0,0 +1,77 @@
+"""
+Pruebas múltiples por segmento
+==============================
+Compara cada par de grupos de cada dimensión (organización, antigüedad, región,
+estado, turno) en cada outcome y score con la prueba t de Student y la d de
+Cohen, igual que estadistica.ttest. Todo sale de n, media y varianza por grupo:
+una agrupación por dimensión y aritmética vectorizada sobre los pares, en lugar
+de una llamada a scipy por prueba.
+
+Con cientos de pruebas, p < 0.05 deja pasar falsos positivos por azar: los
+p-valores se corrigen con Benjamini-Hochberg sobre la familia completa (q ≤ alfa
+controla la proporción esperada de falsos descubrimientos).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as t_student
+
+from .variables import vars_scores
+
+DIMENSIONES = ['Giro_display', 'antiguedad_grupo', 'region_simplificada', 'Estado_limpio', 'turno']
+VARIABLES = ['D_1', 'NPS', 'C_1', 'INFO', *vars_scores]
+MIN_N = 5  # Mismo mínimo por grupo que estadistica.ttest
+ALFA = 0.05
+
+
+def momentos(df, dimension, variables=VARIABLES):
+    """(grupos, n, media, varianza muestral); los tres últimos son arreglos grupos × variables"""
+    g = df.groupby(dimension, observed=True)[variables]
+    n = g.count()
+    flotante = {'dtype': 'float64', 'na_value': np.nan}  # Las escalas Int8 anulables promedian a Float64
+    return n.index.to_numpy(), n.to_numpy(**flotante), g.mean().to_numpy(**flotante), g.var().to_numpy(**flotante)
+
+
+def benjamini_hochberg(p):
+    """q-valores de Benjamini-Hochberg (mismo orden que `p`)"""
+    p = np.asarray(p, dtype='float64')
+    m = len(p)
+    if m == 0:
+        return p
+    orden = np.argsort(p)
+    q = p[orden] * m / np.arange(1, m + 1)
+    q = np.minimum.accumulate(q[::-1])[::-1].clip(max=1)
+    res = np.empty(m)
+    res[orden] = q
+    return res
+
+
+def _pares(dimension, grupos, n, media, var, variables):
+    """Una fila por (par de grupos, variable) con t, gl y d; sin p-valor"""
+    i, j = np.triu_indices(len(grupos), k=1)
+    n1, n2, m1, m2 = n[i], n[j], media[i], media[j]
+    gl = n1 + n2 - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sp = np.sqrt(((n1 - 1) * var[i] + (n2 - 1) * var[j]) / gl)
+        t = (m1 - m2) / (sp * np.sqrt(1 / n1 + 1 / n2))
+        d = np.where(sp > 0, (m1 - m2) / sp, 0.0)
+    k = len(variables)
+    res = pd.DataFrame({
+        'dimension': dimension, 'grupo1': np.repeat(grupos[i], k), 'grupo2': np.repeat(grupos[j], k),
+        'variable': np.tile(variables, len(i)),
+        'n1': n1.ravel(), 'n2': n2.ravel(), 'm1': m1.ravel(), 'm2': m2.ravel(),
+        't': t.ravel(), 'gl': gl.ravel(), 'd': d.ravel(),
+    })
+    return res[(res['n1'] >= MIN_N) & (res['n2'] >= MIN_N) & res['t'].notna()]
+
+
+def bateria(df, dimensiones=DIMENSIONES, variables=VARIABLES, alfa=ALFA):
+    """Todas las comparaciones por pares, ordenadas por p: t, gl, p, d de Cohen, q (BH) y significancia"""
+    res = pd.concat([_pares(dim, *momentos(df, dim, variables), variables) for dim in dimensiones],
+                    ignore_index=True)
+    res[['n1', 'n2', 'gl']] = res[['n1', 'n2', 'gl']].astype('int64')
+    res['p'] = 2 * t_student.sf(np.abs(res['t'].to_numpy()), res['gl'].to_numpy())
+    res['q'] = benjamini_hochberg(res['p'])
+    res['significativo'] = res['q'] <= alfa
+    # Empates en p (p=0 por subdesbordamiento) se desempatan por |t|
+    return res.iloc[np.lexsort((-res['t'].abs().to_numpy(), res['p'].to_numpy()))].reset_index(drop=True)
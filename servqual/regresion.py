@@ -0,0 +1,71 @@
+"""
+Regresión OLS desde estadísticas suficientes
+============================================
+Para explicar el NPS con las cuatro dimensiones o con los 12 ítems basta la
+matriz Z'Z de Z = [1, X, y] sobre los casos completos: n, sumas, productos
+cruzados X'X, X'y y y'y. Se guarda su triángulo superior por celda de
+acumulados (servqual.acumulados), así que el modelo de cualquier combinación de
+filtros es sumar celdas y resolver un sistema de p×p, sin volver a leer filas.
+
+Coeficientes, errores estándar, R², F y p-valores coinciden con sm.OLS (mínimos
+cuadrados ordinarios, errores no robustos).
+"""
+
+import numpy as np
+from scipy.stats import f as f_fisher, t as t_student
+
+from .variables import vars_scores, vars_servqual
+
+OBJETIVO = 'NPS'
+MODELOS = {'scores': vars_scores, 'items': vars_servqual}
+MIN_N = 20  # Igual que estadistica._regresion: con 20 casos o menos no se ajusta
+
+
+def _pares(modelo):
+    k = len(MODELOS[modelo]) + 2  # constante, regresores y objetivo
+    return list(zip(*np.triu_indices(k)))
+
+
+def columnas(modelo):
+    """Nombres de las columnas del triángulo superior de Z'Z del modelo"""
+    return [f'ols_{modelo}_{i}_{j}' for i, j in _pares(modelo)]
+
+
+def momentos(df, modelo, ids, n_celdas):
+    """{columna: suma por celda} de los productos Z_i·Z_j sobre casos completos"""
+    z = df[[*MODELOS[modelo], OBJETIVO]].to_numpy(dtype='float64', na_value=np.nan)
+    completo = ~np.isnan(z).any(axis=1)
+    z = np.column_stack([completo.astype('float64'), np.where(completo[:, None], z, 0.0)])
+    return {nombre: np.bincount(ids, weights=z[:, i] * z[:, j], minlength=n_celdas)
+            for nombre, (i, j) in zip(columnas(modelo), _pares(modelo))}
+
+
+def _matriz(sumas, modelo):
+    k = len(MODELOS[modelo]) + 2
+    m = np.zeros((k, k))
+    for nombre, (i, j) in zip(columnas(modelo), _pares(modelo)):
+        m[i, j] = m[j, i] = sumas[nombre]
+    return m
+
+
+def ajustar(sumas, modelo):
+    """Mismo contenido que estadistica._regresion (más n) a partir de las sumas de Z'Z; None con pocos casos"""
+    m = _matriz(sumas, modelo)
+    n, p = m[0, 0], len(MODELOS[modelo])
+    if n <= MIN_N:
+        return None
+    xtx, xty, yty = m[:-1, :-1], m[:-1, -1], m[-1, -1]
+    inversa = np.linalg.pinv(xtx)
+    beta = inversa @ xty
+    sse = max(yty - beta @ xty, 0.0)
+    sst = yty - m[0, -1] ** 2 / n
+    gl_modelo, gl_resid = np.linalg.matrix_rank(xtx) - 1, n - np.linalg.matrix_rank(xtx)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ee = np.sqrt(np.diag(inversa) * sse / gl_resid)
+        t = beta / ee
+        fvalue = ((sst - sse) / gl_modelo) / (sse / gl_resid)
+    nombres = ['const', *MODELOS[modelo]]
+    return {'n': int(n), 'rsquared': 1 - sse / sst if sst > 0 else np.nan, 'fvalue': fvalue,
+            'f_pvalue': f_fisher.sf(fvalue, gl_modelo, gl_resid),
+            'params': dict(zip(nombres, beta)), 'bse': dict(zip(nombres, ee)),
+            'pvalues': dict(zip(nombres, 2 * t_student.sf(np.abs(t), gl_resid)))}
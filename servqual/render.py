@@ -0,0 +1,90 @@
+"""
+Render HTML por lotes
+=====================
+Cada grupo de tarjetas (KPIs, rankings, oportunidades) se arma como un solo
+bloque HTML a partir de columnas completas, sin iterrows, para enviarlo en un
+único st.markdown: un mensaje al navegador por grupo en lugar de uno por fila.
+"""
+
+from html import escape
+
+import numpy as np
+import pandas as pd
+
+from .metricas import formato_ic
+
+MEDALLAS = np.array(['🥇', '🥈', '🥉'])
+
+
+def _unir(partes):
+    """Concatena una Serie/lista de fragmentos HTML"""
+    return ''.join(partes)
+
+
+def _fragmentos(valores, indice):
+    """Serie de texto (dtype str, también vacía) para concatenar fragmentos HTML"""
+    return pd.Series(list(valores), index=indice, dtype='str')
+
+
+def _medallas(orden):
+    """🥇🥈🥉 y después '4.', '5.', ... alineadas con las filas de `orden`"""
+    n = len(orden)
+    return _fragmentos([*MEDALLAS[:n], *(f"{i}." for i in range(4, n + 1))], orden.index)
+
+
+def _colores(orden, alto, color_alto, color_bajo):
+    return _fragmentos(np.where(alto, color_alto, color_bajo), orden.index)
+
+
+def _texto(serie):
+    return _fragmentos((escape(str(v)) for v in serie), serie.index)
+
+
+def _numero(serie, formato):
+    return _fragmentos((formato.format(v) for v in np.asarray(serie, dtype='float64')), serie.index)
+
+
+def _entero(serie):
+    return _numero(serie, '{:.0f}')
+
+
+def tarjetas_kpi(iconos, valores, etiquetas):
+    """Fila de tarjetas KPI en una rejilla (una columna por tarjeta)"""
+    tarjetas = (f'<div class="kpi-card"><div style="font-size:1.5rem">{i}</div><div class="kpi-value">{v}</div>'
+                f'<div class="kpi-label">{e}</div></div>' for i, v, e in zip(iconos, valores, etiquetas))
+    return f'<div class="kpi-grid" style="grid-template-columns:repeat({len(etiquetas)},1fr)">{_unir(tarjetas)}</div>'
+
+
+def lista_ranking(data, col, color_alto, color_bajo, show_n=False, top=8):
+    """Top de estados por `col`; en color alto los que superan la mediana"""
+    orden = data.sort_values(col, ascending=False).head(top)
+    color = _colores(orden, orden[col] > data[col].median(), color_alto, color_bajo)
+    n_text = ('<small style="color:#999; margin-left:5px">(n=' + _entero(orden['n']) + ')</small>'
+              if show_n else '')
+    filas = ('<div class="rank-item"><b>' + _medallas(orden) + '</b> ' + _texto(orden['Estado_limpio'])
+             + ': <span style="color:' + color + '; font-weight:bold; float:right">' + _numero(orden[col], '{:.1f}')
+             + '</span>' + n_text + '</div>')
+    return _unir(filas)
+
+
+def lista_ranking_normalizado(data, color_alto, color_bajo, top=8):
+    """Top por NPS normalizado con n, confianza e intervalo bootstrap"""
+    orden = data.sort_values('NPS_normalizado', ascending=False).head(top)
+    color = _colores(orden, orden['NPS_normalizado'] > 0, color_alto, color_bajo)
+    filas = ('<div class="rank-item"><b>' + _medallas(orden) + '</b> ' + _texto(orden['Estado_limpio'])
+             + ' <span style="color:' + color + '; font-weight:bold; float:right">' + _numero(orden['NPS_normalizado'], '{:.1f}')
+             + '</span><br><small style="color:#666">NPS: ' + _numero(orden['NPS_Score'], '{:.0f}')
+             + ' × Conf: ' + _numero(orden['confianza'], '{:.0%}') + ' (n=' + _entero(orden['n'])
+             + ')<br>IC 95%: ' + _fragmentos(formato_ic(orden['NPS_IC_inf'], orden['NPS_IC_sup'], '{:.0f} a {:.0f}'), orden.index)
+             + '</small></div>')
+    return _unir(filas)
+
+
+def tarjetas_oportunidad(items, color_valor):
+    """Tarjetas de recomendación: semáforo, ítem, media, dimensión y brecha"""
+    filas = ('<div class="opp-card"><div style="display:flex; justify-content:space-between; align-items:center;">'
+             '<span>' + _texto(items['semaforo']) + ' <b>' + _texto(items['nombre']) + '</b></span>'
+             f'<span style="color:{color_valor}; font-weight:bold">' + _numero(items['mean'], '{:.2f}')
+             + '</span></div><small style="color:#666">' + _texto(items['dimension']) + ' | Gap: '
+             + _numero(items['gap'], '{:.2f}') + ' pts</small></div>')
+    return _unir(filas)
@@ -0,0 +1,200 @@
+"""
+Reportes HTML estáticos
+=======================
+Un reporte SERVQUAL por estado (los 32 de ESTADO_GEOJSON_MAP) y por
+organización, con los mismos KPIs, resumen, mapa, segmentos, oportunidades e
+impulsores del NPS que el dashboard (servqual.figuras, servqual.render). Cada
+archivo es autocontenido: CSS y plotly.js van en línea y los mapas usan un
+fondo sin teselas, así que se abren sin conexión.
+
+Los acumulados se leen (o se calculan) una sola vez en el proceso principal y
+cada worker del pool los recibe al iniciar; un reporte solo suma sus celdas y
+arma las figuras.
+
+    python -m servqual.reportes --salida reportes --procesos 4
+"""
+
+import argparse
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from html import escape
+from pathlib import Path
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from . import almacen, figuras, metricas, render
+from .acumulados import cargar_acumulados, leer_acumulados
+from .estilo import ESCALA_PURPURA, ESTILOS, PALETA
+from .geo import ESTADO_GEOJSON_MAP
+from .regresion import MODELOS
+from .variables import items_names, vars_scores, vars_servqual
+
+DIR_REPORTES = almacen.RAIZ / 'reportes'
+TIPOS = {'Estado_limpio': 'Estado', 'Giro_display': 'Organización'}
+
+# Rejilla de dos columnas del reporte (el resto del CSS es el del dashboard)
+_CSS_REPORTE = """
+<style>
+    body {font-family: 'Source Sans Pro', sans-serif; max-width: 1200px; margin: 0 auto; padding: 24px; color: #262730;}
+    .fila {display: grid; grid-template-columns: repeat(auto-fit, minmax(320px, 1fr)); gap: 1rem; align-items: start;}
+    table {border-collapse: collapse; width: 100%; font-size: 0.85rem;}
+    th, td {border-bottom: 1px solid #eee; padding: 4px 8px; text-align: left;}
+</style>
+"""
+
+# Estado de cada worker: acumulados compartidos y plotly.js (se inicializa una vez por proceso)
+_compartido = {}
+
+
+def objetivos(acumulados):
+    """[(dimensión, valor)]: los 32 estados y cada organización con respuestas"""
+    giros = sorted(acumulados.celdas['Giro_display'].dropna().unique())
+    return [('Estado_limpio', e) for e in ESTADO_GEOJSON_MAP] + [('Giro_display', g) for g in giros]
+
+
+def nombre_archivo(dimension, valor):
+    """estado_ciudad-de-mexico.html, organizacion_educacion.html, ..."""
+    plano = unicodedata.normalize('NFKD', f'{TIPOS[dimension]}_{valor}').encode('ascii', 'ignore').decode().lower()
+    return ''.join(c if c.isalnum() or c == '_' else '-' for c in plano) + '.html'
+
+
+def _iniciar(acumulados, version):
+    _compartido.update(acumulados=acumulados, version=version, plotlyjs=get_plotlyjs())
+
+
+def _figura(fig, sin_conexion=False):
+    if sin_conexion:
+        fig.update_layout(mapbox_style='white-bg')  # Sin teselas remotas
+    return fig.to_html(full_html=False, include_plotlyjs=False, config={'displaylogo': False})
+
+
+def _titulo(texto):
+    return f'<p class="section-title">{texto}</p>'
+
+
+def _columnas(*bloques):
+    return '<div class="fila">' + ''.join(f'<div>{b}</div>' for b in bloques) + '</div>'
+
+
+def _tabla(df):
+    return df.to_html(index=False, border=0, escape=True)
+
+
+def secciones(agg):
+    """Fragmentos HTML del reporte (mismo contenido que la pestaña 1 del dashboard)"""
+    kpis = agg['kpis']
+    partes = [_titulo('📊 Indicadores Clave'), render.tarjetas_kpi(
+        ['🎯', '😊', '⭐', '📋', '📰'],
+        [f"{kpis['nps']:.0f}", f"{kpis['satisfaccion']:.0f}%", f"{kpis['calidad']:.0f}%", f"{kpis['servqual']:.0f}%", f"{kpis['info']:.0f}%"],
+        ['NPS', 'Satisfacción', 'Calidad', 'SERVQUAL', 'Info'])]
+
+    tabla_outcomes, tabla_servqual = metricas.tablas_resumen(agg['resumen'])
+    partes += [_titulo('📋 Resumen de Métricas'), _columnas(
+        '<b>Indicadores de Resultado</b>' + _tabla(tabla_outcomes),
+        '<b>Dimensiones SERVQUAL</b> <i>(escala 1-5)</i>' + _tabla(tabla_servqual))]
+
+    estado_stats = agg['estado_stats']
+    if len(estado_stats):  # También en el reporte de un estado: su polígono y su NPS normalizado con IC
+        partes += [_titulo('🗺️ Distribución Geográfica'), _columnas(
+            _figura(figuras.mapa_choropleth(estado_stats, 'NPS_Score', ESCALA_PURPURA), sin_conexion=True),
+            '<b>Top Estados (NPS normalizado)</b>'
+            + render.lista_ranking_normalizado(estado_stats, PALETA['morado_primario'], PALETA['gris_apagado']))]
+
+    partes += [_titulo('📊 Perfil de Calidad de Servicio'), _columnas(
+        _figura(figuras.radar(kpis['radar'])), _figura(figuras.dona_nps(kpis)) + _figura(figuras.barras_nps(kpis)))]
+
+    barras = [f'<b>Por {titulo}</b>' + _figura(figuras.barras_segmento(agg['segmentos'][grupo], 'NPS', [1, 10],
+                                                                      horizontal=grupo != 'antiguedad_grupo')[0])
+              for grupo, titulo in [('Giro_display', 'Organización'), ('antiguedad_grupo', 'Antigüedad'),
+                                    ('region_simplificada', 'Región')]
+              if len(agg['segmentos'][grupo][0]) > 1]
+    if barras:
+        partes += [_titulo('👥 NPS por Segmento'), _columnas(*barras)]
+
+    items = metricas.brechas_items(agg['item_stats'])
+    top5 = items.head(5)
+    partes += [_titulo('🎯 Áreas de Oportunidad'), _columnas(
+        _figura(figuras.barras_oportunidad(top5, kpis['medias']['score_servqual_total'])),
+        '<b>Recomendaciones de Acción</b>' + render.tarjetas_oportunidad(top5.head(3), PALETA['morado_primario']))]
+
+    modelos = []
+    for modelo, titulo, etiquetas in [('scores', 'Por Dimensión', {v: v.replace('score_', '').title() for v in vars_scores}),
+                                      ('items', 'Por Ítem', {v: f"{v} {items_names[v]}" for v in vars_servqual})]:
+        mod = agg['regresion'][modelo]
+        if mod is None:
+            modelos.append(f'<b>{titulo}</b><div class="stat-box">Se necesitan más de 20 respuestas completas para ajustar el modelo.</div>')
+        else:
+            modelos.append(f'<b>{titulo}</b><div class="stat-box"><b>R² = {mod["rsquared"]:.3f}</b> · F = {mod["fvalue"]:.2f}, '
+                           f'p = {mod["f_pvalue"]:.4f} · n = {mod["n"]:,}</div>'
+                           + _figura(figuras.barras_coeficientes(mod, MODELOS[modelo], etiquetas)))
+    partes += [_titulo('🎯 Impulsores del NPS'), _columnas(*modelos)]
+
+    tablas = []
+    for grupo, titulo in [('Giro_display', 'Organización'), ('region_simplificada', 'Región')]:
+        t = agg['nps_grupos'][grupo]
+        tablas.append(f'<b>NPS por {titulo} (IC 95%)</b>' + _tabla(pd.DataFrame({
+            titulo: t[grupo], 'NPS': t['NPS_Score'].map(lambda x: f"{x:.0f}"),
+            'IC 95%': metricas.formato_ic(t['NPS_IC_inf'], t['NPS_IC_sup']), 'n': t['n']})))
+    partes += [_titulo('🔬 NPS con Intervalo Bootstrap'), _columnas(*tablas)]
+    return partes
+
+
+def documento(dimension, valor, agg, version, plotlyjs):
+    """HTML completo y autocontenido de un reporte"""
+    titulo = f"{TIPOS[dimension]}: {escape(str(valor))}"
+    cuerpo = secciones(agg) if agg['n'] else [
+        '<div class="warning-box">Sin respuestas para esta selección en la versión actual de los datos.</div>']
+    return (f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>SERVQUAL · {titulo}</title>'
+            f'<script type="text/javascript">{plotlyjs}</script>{ESTILOS}{_CSS_REPORTE}</head><body>'
+            f'<h1>💜 SERVQUAL · {titulo}</h1>'
+            f'<p style="color:{PALETA["gris_medio"]}">{agg["n"]:,} respuestas · datos {version} · '
+            f'generado {datetime.now():%Y-%m-%d %H:%M}</p>'
+            + ''.join(cuerpo)
+            + '</body></html>')
+
+
+def generar(objetivo, dir_salida):
+    """Escribe el reporte de (dimensión, valor) con los acumulados del worker; devuelve la ruta"""
+    dimension, valor = objetivo
+    agg = _compartido['acumulados'].agregados({dimension: valor})
+    ruta = Path(dir_salida) / nombre_archivo(dimension, valor)
+    ruta.write_text(documento(dimension, valor, agg, _compartido['version'], _compartido['plotlyjs']), encoding='utf-8')
+    return ruta
+
+
+def _indice(rutas, dir_salida, version):
+    enlaces = ''.join(f'<li><a href="{r.name}">{escape(str(valor))}</a></li>' for (_, valor), r in rutas)
+    ruta = Path(dir_salida) / 'index.html'
+    ruta.write_text(f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Reportes SERVQUAL</title>'
+                    f'{ESTILOS}{_CSS_REPORTE}</head><body><h1>💜 Reportes SERVQUAL</h1>'
+                    f'<p>Datos {version}</p><ul>{enlaces}</ul></body></html>', encoding='utf-8')
+    return ruta
+
+
+def generar_todos(dir_salida=DIR_REPORTES, procesos=None, acumulados=None):
+    """Todos los reportes en un pool de procesos; devuelve la ruta del índice"""
+    version = almacen.version_dataset()
+    if acumulados is None:
+        acumulados = leer_acumulados(version) or cargar_acumulados(
+            almacen.preparar(almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD)), version)
+    dir_salida = Path(dir_salida)
+    dir_salida.mkdir(parents=True, exist_ok=True)
+    lista = objetivos(acumulados)
+    procesos = procesos or min(len(lista), os.cpu_count() or 1)
+    with ProcessPoolExecutor(procesos, initializer=_iniciar, initargs=(acumulados, version)) as pool:
+        rutas = list(pool.map(generar, lista, [dir_salida] * len(lista), chunksize=max(1, len(lista) // (4 * procesos))))
+    return _indice(list(zip(lista, rutas)), dir_salida, version)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reportes HTML estáticos por estado y por organización')
+    parser.add_argument('--salida', default=DIR_REPORTES)
+    parser.add_argument('--procesos', type=int, default=None)
+    args = parser.parse_args()
+    inicio = time.perf_counter()
+    indice = generar_todos(args.salida, args.procesos)
+    print(f"Reportes en {indice.parent} ({time.perf_counter() - inicio:.1f} s)")
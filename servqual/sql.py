@@ -0,0 +1,143 @@
+"""
+Backend DuckDB (opcional)
+=========================
+Con SERVQUAL_BACKEND=duckdb las agregaciones pesadas corren como SQL en un DuckDB
+embebido, directamente sobre el Parquet del almacén y sus incrementos: las celdas
+y el cubo de estadísticas suficientes (de donde salen estados, segmentos, ítems,
+regresiones y el volumen diario) y las tablas de contingencia de chi². DuckDB usa todos los
+núcleos y puede desbordar a disco, así que no hace falta cargar el dataset en
+pandas para construirlos.
+
+El resultado tiene las mismas columnas que la ruta pandas (conteos idénticos;
+sumas de flotantes iguales salvo el orden de redondeo). pandas sigue siendo el
+valor por defecto y DuckDB no es dependencia obligatoria.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import almacen, regresion
+from .acumulados import CATEGORIAS_NPS, HISTOGRAMAS, VARIABLES, _PRIMEROS
+from .cuantiles import ESCALAS
+from .filtros import DIMENSIONES_FILTRO
+from .regresion import MODELOS, OBJETIVO, columnas as columnas_ols
+
+try:
+    import duckdb
+except ImportError:  # Dependencia opcional
+    duckdb = None
+
+BACKEND = os.environ.get('SERVQUAL_BACKEND', 'pandas').lower()
+MEMORIA = os.environ.get('SERVQUAL_DUCKDB_MEMORIA')  # p. ej. '4GB'; sin límite explícito por defecto
+
+_TELETON = 'Teletón (Grupos internos de la Fundación)'
+
+
+def usar_duckdb():
+    """True si SERVQUAL_BACKEND=duckdb (error claro si DuckDB no está instalado)"""
+    if BACKEND != 'duckdb':
+        return False
+    if duckdb is None:
+        raise ImportError("SERVQUAL_BACKEND=duckdb requiere el paquete duckdb (pip install duckdb)")
+    return True
+
+
+def _texto(valor):
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def _caso(columna, mapeo):
+    """CASE que renombra valores de `columna` según `mapeo` (el resto queda igual)"""
+    ramas = ' '.join(f"WHEN {_texto(a)} THEN {_texto(b)}" for a, b in mapeo.items())
+    return f"CASE {columna} {ramas} ELSE {columna} END"
+
+
+def conectar(ruta_parquet=almacen.RUTA_PARQUET, dir_incrementos=almacen.DIR_INCREMENTOS):
+    """Conexión en memoria con la vista `respuestas` (histórico + incrementos, con Giro_display)"""
+    if duckdb is None:
+        raise ImportError("El backend SQL requiere el paquete duckdb (pip install duckdb)")
+    base = almacen.asegurar_parquet(ruta_parquet=ruta_parquet) if ruta_parquet == almacen.RUTA_PARQUET else ruta_parquet
+    archivos = ', '.join(_texto(p) for p in [base, *almacen.partes(dir_incrementos)])
+    con = duckdb.connect()
+    if MEMORIA:
+        con.execute(f"SET memory_limit = {_texto(MEMORIA)}")
+    con.execute(f"""
+        CREATE VIEW respuestas AS
+        SELECT *, {_caso('Giro', almacen.GIRO_DISPLAY)} AS Giro_display
+        FROM read_parquet([{archivos}])
+    """)
+    return con
+
+
+def _ident(nombre):
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+def _indice_contenedor(variable):
+    """Expresión SQL del contenedor de histograma (misma regla que cuantiles.indices)"""
+    minimo, maximo, paso = ESCALAS[variable]
+    x = _ident(variable)
+    return f"CAST(round_even((least(greatest({x}, {minimo}), {maximo}) - {minimo}) / {paso}, 0) AS BIGINT)"
+
+
+def _productos_ols(modelo):
+    """Sumas de Z_i·Z_j (Z = [1, X, y]) sobre casos completos, como regresion.momentos"""
+    variables = [*MODELOS[modelo], OBJETIVO]
+    completo = ' AND '.join(f"{_ident(v)} IS NOT NULL" for v in variables)
+    z = ['1.0', *[f"CAST({_ident(v)} AS DOUBLE)" for v in variables]]
+    return [f"coalesce(sum({z[i]} * {z[j]}) FILTER (WHERE {completo}), 0) AS {_ident(nombre)}"
+            for nombre, (i, j) in zip(columnas_ols(modelo), regresion._pares(modelo))]
+
+
+def estadisticas_suficientes(con, claves=DIMENSIONES_FILTRO, con_histogramas=True):
+    """Mismo resultado que acumulados.estadisticas_suficientes, calculado en DuckDB"""
+    llaves = ', '.join(_ident(k) for k in claves)
+    sumas = ['count(*) AS n']
+    for v in VARIABLES:
+        x = f"CAST({_ident(v)} AS DOUBLE)"
+        sumas += [f"CAST(count({x}) AS DOUBLE) AS {_ident(v + '_n')}",
+                  f"coalesce(sum({x}), 0) AS {_ident(v + '_s')}",
+                  f"coalesce(sum({x} * {x}), 0) AS {_ident(v + '_s2')}"]
+    sumas += [f"CAST(count(*) FILTER (WHERE nps_categoria = {_texto(c)}) AS DOUBLE) AS {_ident(c)}" for c in CATEGORIAS_NPS]
+    sumas += [f"CAST(first({_ident(c)}) AS DOUBLE) AS {_ident(c)}" for c in _PRIMEROS]
+    for modelo in (MODELOS if con_histogramas else []):
+        sumas += _productos_ols(modelo)
+    # Se agrupa directo por las claves; solo el resultado (pocas filas) recibe un id de celda
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _celdas AS
+        SELECT *, CAST(row_number() OVER () - 1 AS BIGINT) AS _id
+        FROM (SELECT {llaves}, {', '.join(sumas)} FROM respuestas GROUP BY {llaves})
+    """)
+    celdas = con.execute("SELECT * EXCLUDE (_id) FROM _celdas ORDER BY _id").df()
+    for k in claves:
+        celdas[k] = celdas[k].astype('datetime64[ms]') if k == 'fecha' else celdas[k].astype(object).where(celdas[k].notna(), np.nan)
+
+    # Mismo orden de columnas que la ruta pandas: histogramas antes que los productos de las regresiones
+    ols = [c for modelo in (MODELOS if con_histogramas else []) for c in columnas_ols(modelo)]
+    bloques = [celdas.drop(columns=ols)]
+    union = ' AND '.join(f"h.{_ident(k)} IS NOT DISTINCT FROM c.{_ident(k)}" for k in claves)
+    for v, nombres in (HISTOGRAMAS.items() if con_histogramas else []):
+        conteos = con.execute(f"""
+            WITH h AS (SELECT {llaves}, {_indice_contenedor(v)} AS j, count(*) AS c
+                       FROM respuestas WHERE {_ident(v)} IS NOT NULL GROUP BY ALL)
+            SELECT c._id, h.j, h.c FROM h JOIN _celdas c ON {union}
+        """).fetchnumpy()
+        matriz = np.zeros((len(celdas), len(nombres)), dtype=np.int64)
+        matriz[conteos['_id'], conteos['j']] = conteos['c']
+        bloques.append(pd.DataFrame(matriz, columns=nombres))
+    return pd.concat([*bloques, celdas[ols]], axis=1)
+
+
+def tablas_chi2(con):
+    """Tablas de contingencia de estadistica.tablas_chi2, calculadas en DuckDB"""
+    def cruzada(filas, expresion):
+        conteos = con.execute(f"""
+            SELECT {expresion} AS f, nps_categoria AS c, count(*) AS n FROM respuestas
+            WHERE {expresion} IS NOT NULL AND nps_categoria IS NOT NULL GROUP BY ALL
+        """).df()
+        tabla = conteos.pivot(index='f', columns='c', values='n').fillna(0).astype('int64').sort_index().sort_index(axis=1)
+        return tabla.rename_axis(index=filas, columns='nps_categoria')
+    return {'chi2_giro': cruzada('Giro_display', _caso('Giro', {_TELETON: 'Teletón'})),
+            'chi2_antiguedad': cruzada('antiguedad_grupo', 'antiguedad_grupo')}
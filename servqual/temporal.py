@@ -0,0 +1,60 @@
+"""
+Volumen de respuestas en el tiempo
+==================================
+Los conteos por celda de filtro y día vienen del cubo de acumulados
+(servqual.acumulados): la serie de un filtro es sumar las celdas seleccionadas,
+sin tocar filas ni volver a convertir fechas. La granularidad (día, semana o
+mes) se elige por el rango de fechas. Si aun así quedan más de MAX_PUNTOS
+periodos (semanas de rangos cercanos a dos años, o más de ocho años por mes) la
+serie se reduce con LTTB (Largest-Triangle-Three-Buckets), que conserva
+extremos, picos y valles con pocos puntos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .filtros import seleccionar_celdas
+
+MAX_PUNTOS = 100  # Lo que la gráfica (ancho de una columna) distingue
+# (días máximos del rango, frecuencia del periodo, etiqueta)
+GRANULARIDADES = [(92, 'D', 'día'), (730, 'W', 'semana'), (np.inf, 'M', 'mes')]
+
+
+def granularidad(inicio, fin):
+    """(frecuencia, etiqueta) según los días entre `inicio` y `fin`"""
+    dias = (fin - inicio).days
+    return next((freq, etiqueta) for limite, freq, etiqueta in GRANULARIDADES if dias <= limite)
+
+
+def lttb(x, y, umbral):
+    """Índices de los `umbral` puntos que conserva LTTB (todos si la serie ya es corta)"""
+    n = len(x)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+    x, y = np.asarray(x, dtype='float64'), np.asarray(y, dtype='float64')
+    # Extremos fijos; los puntos interiores se reparten en umbral-2 cubetas
+    limites = np.linspace(1, n - 1, umbral - 1).astype(np.int64)
+    elegidos = np.empty(umbral, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(umbral - 2):
+        ini, fin = limites[i], limites[i + 1]
+        sig_fin = limites[i + 2] if i + 2 < len(limites) else n
+        cx, cy = x[fin:sig_fin].mean(), y[fin:sig_fin].mean()
+        # Área del triángulo (punto anterior, candidato, promedio de la cubeta siguiente)
+        area = np.abs((x[a] - cx) * (y[ini:fin] - y[a]) - (x[a] - x[ini:fin]) * (cy - y[a]))
+        a = ini + int(np.argmax(area))
+        elegidos[i + 1] = a
+    return elegidos
+
+
+def volumen(cubo, seleccion=None, max_puntos=MAX_PUNTOS):
+    """(DataFrame fecha/respuestas, etiqueta de granularidad) del filtro; periodos sin respuestas no aparecen"""
+    diario = seleccionar_celdas(cubo, seleccion).groupby('fecha')['n'].sum().astype('int64')
+    if diario.empty:
+        return pd.DataFrame({'fecha': pd.Series(dtype='datetime64[ns]'), 'respuestas': pd.Series(dtype='int64')}), 'día'
+    freq, etiqueta = granularidad(diario.index.min(), diario.index.max())
+    serie = diario if freq == 'D' else diario.groupby(diario.index.to_period(freq).start_time).sum()
+    serie = serie.rename_axis('fecha').reset_index(name='respuestas')
+    x = serie['fecha'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    return serie.iloc[lttb(x, serie['respuestas'].to_numpy(), max_puntos)].reset_index(drop=True), etiqueta
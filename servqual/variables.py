@@ -0,0 +1,29 @@
+"""
+Variables del modelo SERVQUAL
+=============================
+Listas de ítems/scores y etiquetas compartidas por el dashboard y el paquete.
+"""
+
+vars_servqual = ['AT_1', 'AT_2', 'FI_1', 'FI_2', 'FI_3', 'R_1', 'R_2', 'R_3', 'E_1', 'E_2', 'E_3', 'E_4']
+vars_scores = ['score_tangibles', 'score_fiabilidad', 'score_responsiveness', 'score_empatia']
+
+# (variable, nombre, escala) de los indicadores de resultado
+vars_outcome = [('D_1', 'Satisfacción', '1-10'), ('NPS', 'Recomendación', '1-10'),
+                ('C_1', 'Calidad', '1-5'), ('INFO', 'Información', '1-10')]
+
+dimensiones_nombres = {'score_tangibles': 'Tangibles', 'score_fiabilidad': 'Fiabilidad',
+                       'score_responsiveness': 'Responsiveness', 'score_empatia': 'Empatía'}
+
+items_names = {'AT_1': 'Apariencia', 'AT_2': 'Documentación', 'FI_1': 'Puntualidad',
+               'FI_2': 'Conocimiento', 'FI_3': 'Info Clara', 'R_1': 'Rapidez',
+               'R_2': 'Disposición', 'R_3': 'Flexibilidad', 'E_1': 'Comprensión',
+               'E_2': 'Tiempo', 'E_3': 'Preocupación', 'E_4': 'Personalización'}
+
+items_dimension = {'AT_1': 'Tangibles', 'AT_2': 'Tangibles', 'FI_1': 'Fiabilidad',
+                   'FI_2': 'Fiabilidad', 'FI_3': 'Fiabilidad', 'R_1': 'Responsiveness',
+                   'R_2': 'Responsiveness', 'R_3': 'Responsiveness', 'E_1': 'Empatía',
+                   'E_2': 'Empatía', 'E_3': 'Empatía', 'E_4': 'Empatía'}
+
+# Métricas de las gráficas por segmento y columnas de agrupación
+metricas_segmento = ['NPS', 'D_1', 'C_1', 'score_servqual_total']
+grupos_segmento = ['Giro_display', 'antiguedad_grupo', 'region_simplificada']
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.sintetico import escribir_parquet
+from servqual import almacen, metricas
+from servqual.variables import grupos_segmento, metricas_segmento, vars_servqual
+
+
+@pytest.fixture(scope='module')
+def df(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp('acumulados')
+    ruta = escribir_parquet(3_000, ruta=directorio / 'sintetico.parquet')
+    return almacen.preparar(almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD, ruta, directorio / 'sin_incrementos'))
+
+
+def _nps(categorias):
+    pct = categorias.value_counts(normalize=True) * 100
+    return pct.get('Promotor', 0) - pct.get('Detractor', 0)
+
+
+@pytest.mark.parametrize('columna', [None, 'Giro_display', 'Estado_limpio'])
+def test_vision_operativa_igual_a_pandas(df, columna):
+    filtros = {columna: df[columna].value_counts().index[0]} if columna else {}
+    res = metricas.vision_operativa(df, **filtros)
+    sub = df[df[columna] == filtros[columna]] if columna else df
+
+    assert res['n'] == len(sub)
+    assert res['kpis']['nps'] == pytest.approx(_nps(sub['nps_categoria']))
+    assert res['kpis']['n_promotores'] == (sub['nps_categoria'] == 'Promotor').sum()
+    pd.testing.assert_series_equal(res['kpis']['medias'], sub[metricas_segmento].mean().astype('float64'),
+                                   check_names=False)
+
+    items = sub[vars_servqual].astype('float64').agg(['mean', 'std']).T
+    pd.testing.assert_frame_equal(res['item_stats'][['mean', 'std']], items.loc[res['item_stats'].index])
+
+    for grupo in grupos_segmento:
+        medias = sub.dropna(subset=[grupo]).groupby(grupo, observed=True)[metricas_segmento].mean()
+        obtenido = res['segmentos'][grupo][0].loc[list(medias.index)]
+        np.testing.assert_allclose(obtenido.to_numpy(), medias.to_numpy(dtype='float64'))
+
+    estados = res['estado_stats'].set_index('Estado_limpio')
+    for estado, grupo in sub.groupby('Estado_limpio', observed=True):
+        assert estados.loc[estado, 'n'] == len(grupo)
+        assert estados.loc[estado, 'NPS_Score'] == pytest.approx(_nps(grupo['nps_categoria']))
+
+    for v in ['NPS', 'score_servqual_total']:
+        serie = sub[v].dropna().astype('float64')
+        assert res['resumen'][v]['Media'] == pytest.approx(serie.mean())
+        assert res['resumen'][v]['Desv.Est.'] == pytest.approx(serie.std())
+    assert len(res['brechas']) == len(vars_servqual)
+
+
+def test_filtro_fuera_de_las_dimensiones(df):
+    valor = df['nps_categoria'].dropna().iloc[0]
+    res = metricas.vision_operativa(df, nps_categoria=valor)
+    assert res['n'] == (df['nps_categoria'] == valor).sum()
+    assert res['kpis']['nps'] == pytest.approx(_nps(df.loc[df['nps_categoria'] == valor, 'nps_categoria']))
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from benchmarks.sintetico import escribir_parquet
+from servqual import almacen
+
+
+@pytest.fixture(scope='module')
+def datos(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp('almacen')
+    ruta = escribir_parquet(3_000, ruta=directorio / 'sintetico.parquet')
+    return almacen.leer_dataset(None, ruta, directorio / 'sin_incrementos')
+
+
+def test_tipos_compactos_ida_y_vuelta(datos):
+    for campo in almacen.ESQUEMA:
+        dtype = datos[campo.name].dtype
+        if campo.type == pa.int8():
+            assert dtype == pd.Int8Dtype(), campo.name
+        elif campo.type == pa.int16():
+            assert dtype == pd.Int16Dtype(), campo.name
+        elif pa.types.is_dictionary(campo.type):
+            assert isinstance(dtype, pd.CategoricalDtype), campo.name
+    assert datos['score_servqual_total'].dtype == np.float64
+    assert datos['lat'].dtype == np.float32
+
+
+def test_nulos_se_conservan_sin_pasar_a_flotante(datos):
+    assert datos['FI_3'].isna().any() and datos['AÑOS'].isna().any()
+    validos = datos['FI_3'].dropna()
+    assert validos.between(1, 5).all()
+    assert datos['FI_3'].to_numpy(dtype='float64', na_value=np.nan).dtype == np.float64
+
+
+@pytest.fixture
+def compartido(datos):
+    return almacen.solo_lectura(almacen.preparar(datos[almacen.COLUMNAS_DASHBOARD]))
+
+
+@pytest.mark.parametrize('mutar', [
+    lambda df: df.__setitem__('nueva', 1),
+    lambda df: df.__delitem__('NPS'),
+    lambda df: df.loc.__setitem__((slice(None), 'nueva'), 1),
+    lambda df: df.drop(columns='NPS', inplace=True),
+    lambda df: df.fillna({'FI_3': 1}, inplace=True),
+    lambda df: df.insert(0, 'nueva', 1),
+    lambda df: setattr(df, 'columns', list(df.columns)),
+], ids=['setitem', 'delitem', 'loc_columna', 'drop_inplace', 'fillna_inplace', 'insert', 'columns'])
+def test_solo_lectura_rechaza_cambios_de_estructura(compartido, mutar):
+    columnas = list(compartido.columns)
+    with pytest.raises(TypeError):
+        mutar(compartido)
+    assert list(compartido.columns) == columnas
+
+
+@pytest.mark.parametrize('columna', ['NPS', 'score_servqual_total', 'Giro_display'])
+def test_solo_lectura_rechaza_escribir_valores(compartido, columna):
+    antes = compartido[columna].iloc[0]
+    with pytest.raises((ValueError, TypeError)):
+        compartido.loc[compartido.index[0], columna] = compartido[columna].iloc[1]
+    assert compartido[columna].iloc[0] == antes
+
+
+def test_derivados_son_dataframes_normales(compartido):
+    derivado = compartido.assign(extra=1)
+    assert type(derivado) is pd.DataFrame and type(compartido.dropna()) is pd.DataFrame
+    derivado['otra'] = 2
+    assert 'otra' not in compartido and 'extra' not in compartido
@@ -0,0 +1,20 @@
+import numpy as np
+
+from servqual import bootstrap, metricas
+
+
+def test_intervalos_grupo_vacio():
+    inf, sup = bootstrap.intervalos_nps([5, 0], [2, 0], [10, 0], replicas=200)
+    assert np.isfinite(inf[0]) and inf[0] <= sup[0]
+    assert np.isnan(inf[1]) and np.isnan(sup[1])
+    assert metricas.formato_ic(inf, sup)[1] == "—"
+    assert metricas.formato_ic([-3.4], [12.6]) == ["[-3, 13]"]
+
+
+def test_pool_reutilizado_entre_llamadas():
+    args = ([5, 3], [2, 4], [10, 9])
+    a = bootstrap.intervalos_nps(*args, replicas=200, procesos=2)
+    pool = bootstrap._pool(2)
+    b = bootstrap.intervalos_nps(*args, replicas=200, procesos=2)
+    assert bootstrap._pool(2) is pool and len(bootstrap._pools) == 1
+    np.testing.assert_array_equal(a, b)
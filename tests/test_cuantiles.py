@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from servqual.cuantiles import ESCALAS, cuantil, histogramas
+
+CUANTILES = [0, 0.1, 0.25, 0.5, 0.75, 0.9, 1]
+
+
+@pytest.mark.parametrize('variable', ['D_1', 'NPS', 'C_1', 'INFO'])
+@pytest.mark.parametrize('n', [1, 2, 7, 1_000])
+def test_exacto_en_escalas_discretas(variable, n):
+    minimo, maximo, _ = ESCALAS[variable]
+    valores = np.random.default_rng(n).integers(minimo, maximo + 1, n).astype('float64')
+    conteos = histogramas(valores, variable)[0]
+    for q in CUANTILES:
+        assert cuantil(conteos, variable, q) == np.quantile(valores, q)
+
+
+@pytest.mark.parametrize('variable', ['score_empatia', 'score_servqual_total'])
+@pytest.mark.parametrize('n', [1, 2, 7, 1_000])
+def test_medio_contenedor_en_escalas_continuas(variable, n):
+    minimo, maximo, paso = ESCALAS[variable]
+    valores = np.random.default_rng(n).uniform(minimo, maximo, n)
+    conteos = histogramas(valores, variable)[0]
+    for q in CUANTILES:
+        assert abs(cuantil(conteos, variable, q) - np.quantile(valores, q)) <= paso / 2 + 1e-12
+
+
+def test_grupos_se_suman_y_nulos_se_ignoran():
+    rng = np.random.default_rng(0)
+    valores = rng.integers(1, 11, 500).astype('float64')
+    valores[::7] = np.nan
+    grupos = rng.integers(0, 3, 500)
+    por_grupo = histogramas(valores, 'NPS', grupos, 3)
+    assert (por_grupo.sum(axis=0) == histogramas(valores, 'NPS')[0]).all()
+    assert cuantil(por_grupo.sum(axis=0), 'NPS', 0.5) == np.nanquantile(valores, 0.5)
+    assert np.isnan(cuantil(np.zeros(10), 'NPS', 0.5))
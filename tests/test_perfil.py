@@ -0,0 +1,36 @@
+import tracemalloc
+
+import pytest
+
+from servqual import perfil
+
+
+def test_cerrar_tras_excepcion_detiene_tracemalloc():
+    assert not tracemalloc.is_tracing()
+    perfilador = perfil.Perfilador()
+    with pytest.raises(RuntimeError):
+        try:
+            with perfilador.medir('seccion'):
+                raise RuntimeError('ejecución interrumpida')
+        finally:
+            perfilador.cerrar()
+    assert not tracemalloc.is_tracing()
+    assert perfilador.mediciones[0]['seccion'] == 'seccion'
+
+
+def test_perfiladores_anidados_comparten_tracemalloc():
+    with perfil.Perfilador() as a:
+        with pytest.raises(ValueError), perfil.Perfilador():
+            raise ValueError
+        assert tracemalloc.is_tracing()  # `a` sigue abierto
+        a.cerrar()  # Idempotente con el cierre del with
+    assert not tracemalloc.is_tracing()
+
+
+def test_trazas_externas_no_se_detienen():
+    tracemalloc.start()
+    try:
+        perfil.Perfilador().cerrar()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
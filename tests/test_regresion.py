@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+
+from servqual import almacen
+from servqual.acumulados import Acumulados
+from servqual.regresion import MODELOS, OBJETIVO
+
+
+@pytest.fixture(scope='module')
+def df():
+    if not almacen.RUTA_PARQUET.exists() and not almacen.RUTA_CSV.exists():
+        pytest.skip('sin datos de muestra')
+    return almacen.preparar(almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD))
+
+
+@pytest.fixture(scope='module')
+def acumulados(df):
+    return Acumulados.desde_frame(df)
+
+
+@pytest.mark.parametrize('modelo', list(MODELOS))
+@pytest.mark.parametrize('giro', [None, 'Educación'])
+def test_igual_a_statsmodels(df, acumulados, modelo, giro):
+    sub = df if giro is None else df[df['Giro_display'] == giro]
+    completos = sub[[*MODELOS[modelo], OBJETIVO]].astype('float64').dropna()
+    esperado = sm.OLS(completos[OBJETIVO], sm.add_constant(completos[MODELOS[modelo]])).fit()
+
+    res = acumulados.regresion(acumulados.seleccionar({'Giro_display': giro} if giro else None))[modelo]
+    nombres = ['const', *MODELOS[modelo]]
+    assert res['n'] == esperado.nobs
+    np.testing.assert_allclose([res['params'][v] for v in nombres], esperado.params[nombres], rtol=1e-7, atol=1e-9)
+    np.testing.assert_allclose([res['bse'][v] for v in nombres], esperado.bse[nombres], rtol=1e-7)
+    assert res['rsquared'] == pytest.approx(esperado.rsquared, rel=1e-9)
+    assert res['fvalue'] == pytest.approx(esperado.fvalue, rel=1e-7)
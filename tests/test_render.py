@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from servqual import render
+
+
+def _estados(n):
+    nps = np.linspace(60, -20, n)
+    return pd.DataFrame({
+        'Estado_limpio': pd.Series([f'Estado {i}' for i in range(n)], dtype='str'),
+        'NPS_Score': nps, 'n': np.arange(n) + 10, 'NPS_normalizado': nps * 0.5, 'confianza': np.full(n, 0.8),
+        'NPS_IC_inf': nps - 5, 'NPS_IC_sup': nps + 5,
+    })
+
+
+@pytest.mark.parametrize('n', [0, 1, 5])
+def test_lista_ranking(n):
+    html = render.lista_ranking(_estados(n), 'NPS_Score', 'alto', 'bajo', show_n=True)
+    assert html.count('rank-item') == n
+    if n:
+        assert '🥇' in html and '(n=10)' in html
+    if n > 3:
+        assert '4.' in html and '5.' in html
+
+
+@pytest.mark.parametrize('n', [0, 1, 5])
+def test_lista_ranking_normalizado(n):
+    html = render.lista_ranking_normalizado(_estados(n), 'alto', 'bajo')
+    assert html.count('rank-item') == n
+    if n:
+        assert 'IC 95%: 55 a 65' in html
+
+
+@pytest.mark.parametrize('n', [0, 1, 5])
+def test_tarjetas_oportunidad(n):
+    items = pd.DataFrame({'semaforo': pd.Series(['🔴'] * n, dtype='str'),
+                          'nombre': pd.Series([f'<Ítem {i}>' for i in range(n)], dtype='str'),
+                          'mean': np.full(n, 3.5), 'dimension': pd.Series(['Empatía'] * n, dtype='str'),
+                          'gap': np.full(n, 0.5)})
+    html = render.tarjetas_oportunidad(items, 'morado')
+    assert html.count('opp-card') == n
+    if n:
+        assert '&lt;Ítem 0&gt;' in html and '3.50' in html
@@ -0,0 +1,24 @@
+import pytest
+
+from benchmarks.sintetico import escribir_parquet
+from servqual import almacen, reportes
+from servqual.acumulados import Acumulados
+
+
+@pytest.fixture(scope='module')
+def acumulados(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp('reportes')
+    ruta = escribir_parquet(3_000, ruta=directorio / 'sintetico.parquet')
+    return Acumulados.desde_frame(almacen.preparar(
+        almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD, ruta, directorio / 'sin_incrementos')))
+
+
+@pytest.mark.parametrize('dimension', ['Estado_limpio', 'Giro_display'])
+def test_reporte_incluye_mapa(acumulados, dimension):
+    valor = acumulados.celdas.groupby(dimension)['n'].sum().idxmax()
+    agg = acumulados.agregados({dimension: valor})
+    html = ''.join(reportes.secciones(agg))
+    assert 'Distribución Geográfica' in html
+    assert html.count('rank-item') == min(8, len(agg['estado_stats']))
+    if dimension == 'Estado_limpio':
+        assert len(agg['estado_stats']) == 1
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')
+
+from benchmarks.sintetico import escribir_parquet
+from servqual import almacen, sql
+from servqual.acumulados import Acumulados
+
+
+@pytest.fixture(scope='module')
+def acumulados(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp('sql')
+    ruta, sin_incrementos = escribir_parquet(3_000, ruta=directorio / 'sintetico.parquet'), directorio / 'sin_incrementos'
+    df = almacen.preparar(almacen.leer_dataset(almacen.COLUMNAS_DASHBOARD, ruta, sin_incrementos))
+    return Acumulados.desde_frame(df), Acumulados.desde_sql(sql.conectar(ruta, sin_incrementos))
+
+
+def _igual(a, b, ruta):
+    if isinstance(a, dict):
+        assert a.keys() == b.keys(), ruta
+        for k in a:
+            _igual(a[k], b[k], f'{ruta}.{k}')
+    elif isinstance(a, tuple):
+        for i, (x, y) in enumerate(zip(a, b)):
+            _igual(x, y, f'{ruta}[{i}]')
+    elif isinstance(a, pd.DataFrame):
+        # Filas por clave: la primera columna si el índice es posicional, si no el índice
+        orden = lambda t: t.sort_values(t.columns[0]).reset_index(drop=True) if isinstance(t.index, pd.RangeIndex) else t.sort_index()
+        pd.testing.assert_frame_equal(orden(a), orden(b), check_dtype=False, check_index_type=False,
+                                      check_like=True, rtol=1e-9, obj=ruta)
+    elif isinstance(a, pd.Series):
+        pd.testing.assert_series_equal(a.sort_index(), b.sort_index(), check_dtype=False, check_index_type=False,
+                                       rtol=1e-9, obj=ruta)
+    elif isinstance(a, (float, np.floating)):
+        assert a == pytest.approx(b, rel=1e-9, nan_ok=True), ruta
+    else:
+        assert a == b, ruta
+
+
+@pytest.mark.parametrize('seleccion', [None, {'Giro_display': 'Educación'},
+                                       {'Estado_limpio': ('Jalisco', 'Nuevo León'), 'antiguedad_grupo': ()}])
+def test_agregados_iguales_a_pandas(acumulados, seleccion):
+    pandas, duck = acumulados
+    assert pandas.agregados(seleccion)['n'] > 0
+    _igual(pandas.agregados(seleccion), duck.agregados(seleccion), 'agregados')
+    _igual(pandas.facetas(seleccion), duck.facetas(seleccion), 'facetas')
+
+
+def test_cubo_igual_a_pandas(acumulados):
+    pandas, duck = acumulados
+    assert len(pandas.cubo) == len(duck.cubo)
+    columnas = [c for c in pandas.cubo.columns if c not in pandas.claves and c != 'fecha']
+    np.testing.assert_allclose(duck.cubo[columnas].sum().to_numpy(), pandas.cubo[columnas].sum().to_numpy(), rtol=1e-9)
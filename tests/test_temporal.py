@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from servqual import temporal
+
+
+def test_lttb_conserva_extremos():
+    x = np.arange(10_000)
+    y = np.sin(x / 300) * 10
+    y[1234], y[8765] = 100, -100
+    elegidos = temporal.lttb(x, y, 100)
+    assert len(elegidos) == 100
+    assert elegidos[0] == 0 and elegidos[-1] == len(x) - 1
+    assert {1234, 8765} <= set(elegidos)
+    assert np.all(np.diff(elegidos) > 0)
+
+
+def test_volumen_reduce_series_largas():
+    fechas = pd.date_range('2000-01-01', '2019-12-31', freq='D')
+    n = np.ones(len(fechas), dtype='int64')
+    n[fechas.to_period('M') == pd.Period('2007-06', 'M')] = 50  # Pico mensual
+    cubo = pd.DataFrame({'fecha': fechas, 'n': n})
+    vol, periodo = temporal.volumen(cubo)
+    assert periodo == 'mes'
+    assert len(vol) == temporal.MAX_PUNTOS  # 240 meses reducidos
+    assert vol['fecha'].iloc[0] == pd.Timestamp('2000-01-01')
+    assert vol['fecha'].iloc[-1] == pd.Timestamp('2019-12-01')
+    assert vol['respuestas'].max() == 50 * 30
+    assert pd.Timestamp('2007-06-01') in set(vol['fecha'])
+
+
+def test_volumen_serie_corta_sin_reducir():
+    fechas = pd.date_range('2025-04-01', periods=30, freq='D')
+    vol, periodo = temporal.volumen(pd.DataFrame({'fecha': fechas, 'n': np.arange(30)}))
+    assert periodo == 'día'
+    assert len(vol) == 30